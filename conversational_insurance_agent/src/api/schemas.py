@@ -0,0 +1,88 @@
+"""Request and response models for the public HTTP API."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+try:  # pragma: no cover - pydantic v2 optional
+    from pydantic import ConfigDict
+except ImportError:  # pragma: no cover - pydantic v1 fallback
+    ConfigDict = None  # type: ignore[misc, assignment]
+
+from ..state.client_context import ClientDatum
+
+
+class ChatRequest(BaseModel):
+    session_id: str = Field(..., description="Stable identifier for the conversation thread")
+    message: str = Field(..., description="User utterance")
+    channel: str = Field("web", description="Channel identifier such as web, whatsapp, telegram")
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    clients: List[ClientDatum] = Field(
+        default_factory=list,
+        alias="clientData",
+        description="Known traveller details supplied by the integrating partner",
+    )
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(populate_by_name=True)
+
+    else:  # pragma: no cover - pydantic v1 compatibility
+        class Config:
+            allow_population_by_field_name = True
+
+
+class ToolRun(BaseModel):
+    name: str
+    input: Dict[str, Any]
+    result: Any
+    tool_call_id: Optional[str] = None
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
+
+
+class ActionRequest(BaseModel):
+    tool: str
+    input: Dict[str, Any] = Field(default_factory=dict)
+    tool_call_id: Optional[str] = None
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
+
+
+class ChatResponse(BaseModel):
+    output: str
+    actions: List[ActionRequest] = Field(default_factory=list)
+    tool_used: Optional[str] = None
+    tool_result: Optional[Any] = None
+    tool_runs: List[ToolRun] = Field(default_factory=list)
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
+
+
+class IngestRequest(BaseModel):
+    refresh: bool = False
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
+
+
+class TaxonomyExtractionResponse(BaseModel):
+    layer_1_general_conditions: List[Dict[str, Any]]
+    layer_2_benefits: List[Dict[str, Any]]
+    layer_3_benefit_conditions: List[Dict[str, Any]]
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
+
+
+class TelegramWebhook(BaseModel):
+    chat_id: str
+    text: str
+    username: Optional[str] = None
+
+    if ConfigDict:  # pragma: no branch
+        model_config = ConfigDict(frozen=True)
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List
+
+from ..services.media_ingestion import MediaAttachment
 
 
 @dataclass
-class WhatsAppMediaAttachment:
-    url: str
-    content_type: str
-    filename: Optional[str] = None
-    media_sid: Optional[str] = None
+class WhatsAppMediaAttachment(MediaAttachment):
+    """Twilio media reference, usable directly as a ``MediaAttachment``."""
 
     @property
     def is_image(self) -> bool:
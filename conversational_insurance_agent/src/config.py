@@ -47,6 +47,7 @@ class Settings(BaseSettings):
     ancileo_default_language: str = Field("en", env="ANCILEO_DEFAULT_LANGUAGE")
     ancileo_default_channel: str = Field("white-label", env="ANCILEO_DEFAULT_CHANNEL")
     ancileo_default_device: str = Field("DESKTOP", env="ANCILEO_DEFAULT_DEVICE")
+    ancileo_quote_cache_ttl: float = Field(60.0, env="ANCILEO_QUOTE_CACHE_TTL")
     google_client_id: str = Field("", env="GOOGLE_CLIENT_ID")
     google_client_secret: str = Field("", env="GOOGLE_CLIENT_SECRET")
     google_redirect_uri: str = Field("", env="GOOGLE_REDIRECT_URI")
@@ -4,7 +4,7 @@ import asyncio
 import json
 import math
 from datetime import UTC, date, datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import uuid4
 
 from groq import Groq
@@ -29,14 +29,34 @@ TOOL_INSTRUCTION = (
 
 
 class ConversationalOrchestrator:
-    def __init__(self, tools: List[ToolSpec]) -> None:
+    def __init__(self, tools: List[ToolSpec], resources: Sequence[Any] = ()) -> None:
         self._settings = get_settings()
+        self._resources = tuple(resources)
         self._client = Groq(api_key=self._settings.groq_api_key)
         self._session_store = ConversationSessionStore()
         self._tool_map = {tool.name: tool for tool in tools}
+        self._tool_descriptions = "\n".join(
+            f"- {tool.name}: {tool.description} | Schema: {json.dumps(tool.schema)}"
+            for tool in self._tool_map.values()
+        )
+
+    async def aclose(self) -> None:
+        for resource in self._resources:
+            await resource.aclose()
+
+    def merge_clients(
+        self,
+        session_id: str,
+        clients: List[ClientDatum],
+        source: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        self._session_store.merge_clients(session_id, clients, source, fingerprint)
 
-    def merge_clients(self, session_id: str, clients: List[ClientDatum], source: Optional[str] = None) -> None:
-        self._session_store.merge_clients(session_id, clients, source)
+    def merge_clients_if_changed(
+        self, session_id: str, clients: List[ClientDatum], source: Optional[str], fingerprint: str
+    ) -> bool:
+        return self._session_store.merge_clients_if_changed(session_id, clients, source, fingerprint)
 
     async def handle_message(
         self, *, session_id: str, user_message: str, channel: str
@@ -48,11 +68,6 @@ class ConversationalOrchestrator:
 
         risk_payload = await self._maybe_prime_travel_risk_prediction(session_id, clients)
 
-        tool_descriptions = "\n".join(
-            f"- {tool.name}: {tool.description} | Schema: {json.dumps(tool.schema)}"
-            for tool in self._tool_map.values()
-        )
-
         system_message = {
             "role": "system",
             "content": (
@@ -60,7 +75,7 @@ class ConversationalOrchestrator:
                 "Adapt tone to the user's emotion, maintain concise yet thorough answers, "
                 "and always explain reasoning with citations when referencing policies.\n\n"
                 f"Channel: {channel}.\n"
-                f"Available Tools:\n{tool_descriptions}\n\n"
+                f"Available Tools:\n{self._tool_descriptions}\n\n"
                 f"{TOOL_INSTRUCTION}\n\n"
                 "Pricing guidance: never estimate or reuse premiums. Always call the "
                 "travel_insurance_quote tool (Ancileo pricing API) before sharing any price.\n"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from functools import partial
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
@@ -14,6 +15,9 @@ from .orchestrator import ConversationalOrchestrator
 from .tooling import ToolSpec
 
 
+_orchestrator_lock = threading.Lock()
+
+
 def build_orchestrator() -> ConversationalOrchestrator:
     policy_agent = PolicyResearchAgent()
     claims_tool = ClaimsInsightTool()
@@ -380,7 +384,22 @@ def build_orchestrator() -> ConversationalOrchestrator:
         ),
     ]
 
-    return ConversationalOrchestrator(tools)
+    return ConversationalOrchestrator(tools, resources=(payment_gateway, ancileo_api))
+
+
+def ensure_orchestrator(state: Any) -> ConversationalOrchestrator:
+    """Return the orchestrator stored on ``state``, building it if startup preload did not."""
+
+    orchestrator = getattr(state, "orchestrator", None)
+    if orchestrator is not None:
+        return orchestrator
+    # Dependencies resolve on worker threads, so concurrent first requests must not double-build.
+    with _orchestrator_lock:
+        orchestrator = getattr(state, "orchestrator", None)
+        if orchestrator is None:
+            orchestrator = build_orchestrator()
+            state.orchestrator = orchestrator
+    return orchestrator
 
 
 def _policy_research_tool_handler(
@@ -1,5 +1,5 @@
 """Gmail-integrated web portal."""
 
-from .router import mount_static, router
+from .router import mount_static, router, shutdown_executor
 
-__all__ = ["router", "mount_static"]
+__all__ = ["router", "mount_static", "shutdown_executor"]
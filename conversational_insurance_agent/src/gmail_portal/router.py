@@ -1,24 +1,32 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from google.auth.transport.requests import Request as GoogleAuthRequest
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from starlette.concurrency import run_in_threadpool
 from urllib.parse import urlparse
 
 from ..config import Settings, get_settings
 from ..core.orchestrator import ConversationalOrchestrator
+from ..core.setup import ensure_orchestrator
 from ..services.gmail_ticket_scraper import GmailDataError, fetch_travel_client
-from ..state.client_context import ClientDatum, serialize_client
+from ..state.client_context import ClientDatum, construct_client, serialize_client
 from ..utils.logging import logger
 
 
@@ -39,12 +47,49 @@ SESSION_ID_KEY = "gmail_session_id"
 SESSION_CHANNEL_KEY = "gmail_channel"
 DEFAULT_CHANNEL = "gmail_portal"
 
-GOOGLE_SCOPES = (
+_GMAIL_SESSION_KEYS = (
+    SESSION_CREDENTIALS_KEY,
+    SESSION_PROFILE_KEY,
+    SESSION_CLIENT_KEY,
+    SESSION_ID_KEY,
+    SESSION_CHANNEL_KEY,
+    SESSION_STATE_KEY,
+)
+
+GOOGLE_SCOPES: List[str] = [
     "openid",
     "https://www.googleapis.com/auth/userinfo.email",
     "https://www.googleapis.com/auth/userinfo.profile",
     "https://www.googleapis.com/auth/gmail.readonly",
-)
+]
+
+GMAIL_SCRAPE_WORKERS = 8
+CREDENTIALS_REFRESH_MARGIN_SECONDS = 300
+CLIENT_CACHE_MAX_ENTRIES = 256
+REFRESH_STATE_MAX_ENTRIES = 1024
+CLIENT_CACHE_TTL_SECONDS = 600.0
+
+_gmail_executor: Optional[ThreadPoolExecutor] = None
+
+# Shared transport so token refreshes reuse pooled connections to Google.
+_GOOGLE_AUTH_REQUEST = GoogleAuthRequest()
+
+
+def _get_gmail_executor() -> ThreadPoolExecutor:
+    global _gmail_executor
+    if _gmail_executor is None:
+        _gmail_executor = ThreadPoolExecutor(
+            max_workers=GMAIL_SCRAPE_WORKERS,
+            thread_name_prefix="gmail-scrape",
+        )
+    return _gmail_executor
+
+
+def shutdown_executor() -> None:
+    global _gmail_executor
+    if _gmail_executor is not None:
+        _gmail_executor.shutdown(wait=False)
+        _gmail_executor = None
 
 
 def mount_static(app) -> None:  # pragma: no cover - runtime wiring
@@ -53,11 +98,21 @@ def mount_static(app) -> None:  # pragma: no cover - runtime wiring
     app.mount("/gmail/static", StaticFiles(directory=str(STATIC_DIR)), name="gmail-static")
 
 
-def get_portal_orchestrator(request: Request) -> Optional[ConversationalOrchestrator]:
-    orchestrator = getattr(request.app.state, "orchestrator", None)
-    if isinstance(orchestrator, ConversationalOrchestrator):
-        return orchestrator
-    return None
+def get_portal_orchestrator(request: Request) -> ConversationalOrchestrator:
+    return ensure_orchestrator(request.app.state)
+
+
+@lru_cache(maxsize=8)
+def _client_config(client_id: str, client_secret: str, redirect_uri: str) -> Dict[str, Any]:
+    return {
+        "web": {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "redirect_uris": [redirect_uri],
+        }
+    }
 
 
 def _build_flow(settings: Settings) -> Flow:
@@ -96,45 +151,99 @@ def _build_flow(settings: Settings) -> Flow:
             detail="GOOGLE_REDIRECT_URI must start with https:// or http://localhost.",
         )
 
-    client_config = {
-        "web": {
-            "client_id": settings.google_client_id,
-            "client_secret": settings.google_client_secret,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "redirect_uris": [redirect_uri],
-        }
-    }
-
-    flow = Flow.from_client_config(client_config, scopes=list(GOOGLE_SCOPES))
+    client_config = _client_config(settings.google_client_id, settings.google_client_secret, redirect_uri)
+    flow = Flow.from_client_config(client_config, scopes=GOOGLE_SCOPES)
     flow.redirect_uri = redirect_uri
     return flow
 
 
-def _load_credentials(request: Request, settings: Settings) -> Credentials:
+def _needs_refresh(credentials: Credentials) -> bool:
+    if not credentials.refresh_token:
+        return False
+    if credentials.expired:
+        return True
+    expiry = credentials.expiry
+    if expiry is None:
+        return False
+    # google-auth stores expiry as a naive UTC datetime.
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    remaining = (expiry - datetime.now(timezone.utc)).total_seconds()
+    return remaining < CREDENTIALS_REFRESH_MARGIN_SECONDS
+
+
+@dataclass(eq=False)
+class _RefreshState:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    credentials: Optional[Credentials] = None
+
+
+def _get_refresh_state(request: Request) -> Optional[_RefreshState]:
+    session_id = request.session.get(SESSION_ID_KEY)
+    if not session_id:
+        return None
+    states = getattr(request.app.state, "refresh_states", None)
+    if states is None:
+        states = OrderedDict()
+        request.app.state.refresh_states = states
+    state = states.get(session_id)
+    if state is None:
+        state = states[session_id] = _RefreshState()
+        while len(states) > REFRESH_STATE_MAX_ENTRIES:
+            states.popitem(last=False)
+    else:
+        states.move_to_end(session_id)
+    return state
+
+
+def _credentials_to_session(credentials: Credentials) -> Dict[str, Any]:
+    # ``to_json`` is the only serialiser that tracks every field google-auth needs to refresh
+    # (rapt_token, universe_domain, account, ...), so reuse it rather than mirroring it by hand.
+    return orjson.loads(credentials.to_json())
+
+
+async def _refresh_credentials(request: Request, credentials: Credentials) -> None:
+    loop = asyncio.get_running_loop()
+    previous_token = credentials.token
+    try:
+        await loop.run_in_executor(None, credentials.refresh, _GOOGLE_AUTH_REQUEST)
+        if credentials.token != previous_token:
+            request.session[SESSION_CREDENTIALS_KEY] = _credentials_to_session(credentials)
+    except Exception as exc:  # pragma: no cover - network interaction
+        logger.exception("gmail_portal.credentials_refresh_failed", error=str(exc))
+        request.session.pop(SESSION_CREDENTIALS_KEY, None)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Google session expired") from exc
+
+
+async def _load_credentials(request: Request, settings: Settings) -> Credentials:
     stored = request.session.get(SESSION_CREDENTIALS_KEY)
     if not stored:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authenticate with Google first.")
 
     if isinstance(stored, str):
         try:
-            stored_data = json.loads(stored)
-        except json.JSONDecodeError as exc:
+            stored_data = orjson.loads(stored)
+        except orjson.JSONDecodeError as exc:
             logger.warning("gmail_portal.credentials_invalid", error=str(exc))
             request.session.pop(SESSION_CREDENTIALS_KEY, None)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials state") from exc
     else:
         stored_data = stored
 
-    credentials = Credentials.from_authorized_user_info(stored_data, scopes=list(GOOGLE_SCOPES))
-    if credentials.expired and credentials.refresh_token:
-        try:
-            credentials.refresh(GoogleAuthRequest())
-            request.session[SESSION_CREDENTIALS_KEY] = json.loads(credentials.to_json())
-        except Exception as exc:  # pragma: no cover - network interaction
-            logger.exception("gmail_portal.credentials_refresh_failed", error=str(exc))
-            request.session.pop(SESSION_CREDENTIALS_KEY, None)
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Google session expired") from exc
+    credentials = Credentials.from_authorized_user_info(stored_data, scopes=GOOGLE_SCOPES)
+    if _needs_refresh(credentials):
+        state = _get_refresh_state(request)
+        if state is None:
+            await _refresh_credentials(request, credentials)
+            return credentials
+        async with state.lock:
+            # Concurrent requests carry the same stale cookie; reuse whichever refresh won the lock.
+            fresher = state.credentials
+            if fresher is not None and not _needs_refresh(fresher):
+                request.session[SESSION_CREDENTIALS_KEY] = _credentials_to_session(fresher)
+                return fresher
+            await _refresh_credentials(request, credentials)
+            state.credentials = credentials
     return credentials
 
 
@@ -153,7 +262,7 @@ async def _complete_oauth_login(request: Request, settings: Settings) -> None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="OAuth token exchange failed") from exc
 
     credentials = flow.credentials
-    request.session[SESSION_CREDENTIALS_KEY] = json.loads(credentials.to_json())
+    request.session[SESSION_CREDENTIALS_KEY] = _credentials_to_session(credentials)
 
     profile = await _fetch_userinfo(credentials)
     request.session[SESSION_PROFILE_KEY] = profile
@@ -192,14 +301,79 @@ def _deserialize_client(payload: Dict[str, Any]) -> ClientDatum:
     return ClientDatum.model_validate(payload)
 
 
-async def _load_client(request: Request, credentials: Credentials) -> ClientDatum:
+def _deserialize_trusted(payload: Dict[str, Any]) -> ClientDatum:
+    # Session payloads are produced by ``_serialize_client`` in this process.
+    return construct_client(payload)
+
+
+@dataclass
+class _CachedClient:
+    client: ClientDatum
+    payload: Dict[str, Any]
+    fingerprint: str
+    expires_at: float = 0.0
+
+
+def _client_fingerprint(payload: Dict[str, Any]) -> str:
+    encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _cache_client(
+    cache: OrderedDict[str, _CachedClient],
+    session_id: str,
+    client: ClientDatum,
+    payload: Dict[str, Any],
+    fingerprint: Optional[str] = None,
+) -> _CachedClient:
+    entry = _CachedClient(
+        client=client,
+        payload=payload,
+        fingerprint=fingerprint or _client_fingerprint(payload),
+        expires_at=time.monotonic() + CLIENT_CACHE_TTL_SECONDS,
+    )
+    cache[session_id] = entry
+    cache.move_to_end(session_id)
+    while len(cache) > CLIENT_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+    return entry
+
+
+def _cached_client(
+    cache: OrderedDict[str, _CachedClient], session_id: str, fingerprint: str
+) -> Optional[_CachedClient]:
+    entry = cache.get(session_id)
+    if entry is None:
+        return None
+    # Another worker may have rewritten the session payload, so only trust an exact match.
+    if entry.fingerprint != fingerprint or entry.expires_at <= time.monotonic():
+        del cache[session_id]
+        return None
+    cache.move_to_end(session_id)
+    return entry
+
+
+def _get_client_cache(request: Request) -> OrderedDict[str, _CachedClient]:
+    cache = getattr(request.app.state, "client_cache", None)
+    if cache is None:
+        cache = OrderedDict()
+        request.app.state.client_cache = cache
+    return cache
+
+
+async def _load_client(request: Request, credentials: Credentials, session_id: str) -> _CachedClient:
     cached_payload: Optional[Dict[str, Any]] = request.session.get(SESSION_CLIENT_KEY)
     profile: Dict[str, Any] = request.session.get(SESSION_PROFILE_KEY, {})
+    cache = _get_client_cache(request)
 
     if cached_payload:
+        fingerprint = _client_fingerprint(cached_payload)
+        entry = _cached_client(cache, session_id, fingerprint)
+        if entry is not None:
+            return entry
         try:
-            client = _deserialize_client(cached_payload)
-            return client
+            client = _deserialize_trusted(cached_payload)
+            return _cache_client(cache, session_id, client, cached_payload, fingerprint)
         except Exception as exc:
             logger.warning("gmail_portal.client_deserialize_failed", error=str(exc))
             request.session.pop(SESSION_CLIENT_KEY, None)
@@ -208,12 +382,31 @@ async def _load_client(request: Request, credentials: Credentials) -> ClientDatu
         return fetch_travel_client(credentials, profile=profile)
 
     try:
-        client = await run_in_threadpool(build_client)
+        loop = asyncio.get_running_loop()
+        client = await loop.run_in_executor(_get_gmail_executor(), build_client)
     except GmailDataError as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
 
-    request.session[SESSION_CLIENT_KEY] = _serialize_client(client)
-    return client
+    entry = _cache_client(cache, session_id, client, _serialize_client(client))
+    request.session[SESSION_CLIENT_KEY] = entry.payload
+    return entry
+
+
+def _merge_client_if_changed(
+    request: Request,
+    orchestrator: ConversationalOrchestrator,
+    session_id: str,
+    entry: _CachedClient,
+    channel: str,
+) -> None:
+    # The merged marker is kept in the conversation store, not the (longer-lived) session cookie,
+    # so an expired conversation is always re-seeded with the client context.
+    orchestrator.merge_clients_if_changed(
+        session_id=session_id,
+        clients=[entry.client],
+        source=channel,
+        fingerprint=entry.fingerprint,
+    )
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -256,31 +449,26 @@ async def oauth_callback(request: Request, settings: Settings = Depends(get_sett
 async def chat_page(
     request: Request,
     settings: Settings = Depends(get_settings),
-    orchestrator: Optional[ConversationalOrchestrator] = Depends(get_portal_orchestrator),
+    orchestrator: ConversationalOrchestrator = Depends(get_portal_orchestrator),
 ) -> HTMLResponse:
     if "code" in request.query_params:
         await _complete_oauth_login(request, settings)
         return RedirectResponse(url=request.url.path, status_code=status.HTTP_302_FOUND)
 
-    credentials = _load_credentials(request, settings)
+    credentials = await _load_credentials(request, settings)
     profile = request.session.get(SESSION_PROFILE_KEY)
     if not profile:
         profile = await _fetch_userinfo(credentials)
         request.session[SESSION_PROFILE_KEY] = profile
 
-    client = await _load_client(request, credentials)
-
     session_id = _ensure_session_id(request, profile)
+    entry = await _load_client(request, credentials, session_id)
+    client = entry.client
     channel = request.session.get(SESSION_CHANNEL_KEY, DEFAULT_CHANNEL)
 
-    if orchestrator is None:
-        from ..core.setup import build_orchestrator
-
-        orchestrator = build_orchestrator()
-        request.app.state.orchestrator = orchestrator
-
-    assert orchestrator is not None  # for type checkers
-    orchestrator.merge_clients(session_id=session_id, clients=[client], source=channel)
+    orchestrator.merge_clients(
+        session_id=session_id, clients=[client], source=channel, fingerprint=entry.fingerprint
+    )
 
     context = {
         "request": request,
@@ -297,30 +485,23 @@ async def chat_send(
     payload: Dict[str, Any],
     request: Request,
     settings: Settings = Depends(get_settings),
-    orchestrator: Optional[ConversationalOrchestrator] = Depends(get_portal_orchestrator),
+    orchestrator: ConversationalOrchestrator = Depends(get_portal_orchestrator),
 ) -> JSONResponse:
     message = (payload.get("message") or "").strip()
     if not message:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Message cannot be empty")
 
-    credentials = _load_credentials(request, settings)
+    credentials = await _load_credentials(request, settings)
     profile = request.session.get(SESSION_PROFILE_KEY)
     if not profile:
         profile = await _fetch_userinfo(credentials)
         request.session[SESSION_PROFILE_KEY] = profile
 
-    client = await _load_client(request, credentials)
     session_id = _ensure_session_id(request, profile)
+    entry = await _load_client(request, credentials, session_id)
     channel = request.session.get(SESSION_CHANNEL_KEY, DEFAULT_CHANNEL)
 
-    if orchestrator is None:
-        from ..core.setup import build_orchestrator
-
-        orchestrator = build_orchestrator()
-        request.app.state.orchestrator = orchestrator
-
-    assert orchestrator is not None  # for type checkers
-    orchestrator.merge_clients(session_id=session_id, clients=[client], source=channel)
+    _merge_client_if_changed(request, orchestrator, session_id, entry, channel)
 
     response = await orchestrator.handle_message(
         session_id=session_id,
@@ -338,10 +519,9 @@ async def chat_send(
 
 @router.get("/logout")
 async def logout(request: Request) -> RedirectResponse:
-    request.session.pop(SESSION_CREDENTIALS_KEY, None)
-    request.session.pop(SESSION_PROFILE_KEY, None)
-    request.session.pop(SESSION_CLIENT_KEY, None)
-    request.session.pop(SESSION_ID_KEY, None)
-    request.session.pop(SESSION_CHANNEL_KEY, None)
-    request.session.pop(SESSION_STATE_KEY, None)
+    session_id = request.session.get(SESSION_ID_KEY)
+    if session_id:
+        _get_client_cache(request).pop(session_id, None)
+    for key in _GMAIL_SESSION_KEYS:
+        request.session.pop(key, None)
     return RedirectResponse(url="/gmail/login", status_code=status.HTTP_302_FOUND)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import html
 import json
 import os
+import shutil
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import partial
 from tempfile import NamedTemporaryFile
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, AsyncIterator, Dict, Optional
 
 import uvicorn
 from fastapi import (
@@ -19,84 +24,74 @@ from fastapi import (
     UploadFile,
 )
 from fastapi.concurrency import run_in_threadpool
-from fastapi.responses import JSONResponse, Response
-from pydantic import BaseModel, Field
+from fastapi.responses import Response
 from starlette.middleware.sessions import SessionMiddleware
 
-try:  # pragma: no cover - pydantic v2 optional
-    from pydantic import ConfigDict
-except ImportError:  # pragma: no cover - pydantic v1 fallback
-    ConfigDict = None  # type: ignore[misc, assignment]
-
+from .api.schemas import (
+    ChatRequest,
+    ChatResponse,
+    IngestRequest,
+    TaxonomyExtractionResponse,
+    TelegramWebhook,
+)
 from .channels.whatsapp import WhatsAppMessage
 from .config import Settings, get_settings
 from .core.orchestrator import ConversationalOrchestrator
-from .core.setup import build_orchestrator
-from .services.media_ingestion import GroqMediaIngestor, MediaAttachment
-from .services.policy_taxonomy import IngestCfg, PolicyIngestor, extract_all_layers
+from .core.setup import build_orchestrator, ensure_orchestrator
+from .services.media_ingestion import GroqMediaIngestor
+from .services.policy_taxonomy import (
+    IngestCfg,
+    PolicyIngestor,
+    extract_all_layers,
+    shutdown_extract_pool,
+)
 from .state.client_context import ClientDatum
 from .utils.logging import configure_logging, logger
 from .web import mount_integration_static, router as integration_router
-from .gmail_portal import mount_static as mount_gmail_static, router as gmail_router
-
-
-class ChatRequest(BaseModel):
-    session_id: str = Field(..., description="Stable identifier for the conversation thread")
-    message: str = Field(..., description="User utterance")
-    channel: str = Field("web", description="Channel identifier such as web, whatsapp, telegram")
-    metadata: Dict[str, Any] = Field(default_factory=dict)
-    clients: List[ClientDatum] = Field(
-        default_factory=list,
-        alias="clientData",
-        description="Known traveller details supplied by the integrating partner",
-    )
-
-    if ConfigDict:  # pragma: no branch
-        model_config = ConfigDict(populate_by_name=True)
-
-    else:  # pragma: no cover - pydantic v1 compatibility
-        class Config:
-            allow_population_by_field_name = True
-
-class ToolRun(BaseModel):
-    name: str
-    input: Dict[str, Any]
-    result: Any
-    tool_call_id: Optional[str] = None
-
-
-class ActionRequest(BaseModel):
-    tool: str
-    input: Dict[str, Any] = Field(default_factory=dict)
-    tool_call_id: Optional[str] = None
-
-
-class ChatResponse(BaseModel):
-    output: str
-    actions: List[ActionRequest] = Field(default_factory=list)
-    tool_used: Optional[str] = None
-    tool_result: Optional[Any] = None
-    tool_runs: List[ToolRun] = Field(default_factory=list)
-
-
-class IngestRequest(BaseModel):
-    refresh: bool = False
+from .gmail_portal import (
+    mount_static as mount_gmail_static,
+    router as gmail_router,
+    shutdown_executor as shutdown_gmail_executor,
+)
 
 
-class TaxonomyExtractionResponse(BaseModel):
-    layer_1_general_conditions: List[Dict[str, Any]]
-    layer_2_benefits: List[Dict[str, Any]]
-    layer_3_benefit_conditions: List[Dict[str, Any]]
+_TWIML_PROLOG = b'<?xml version="1.0" encoding="UTF-8"?><Response><Message>'
+_TWIML_EPILOG = b"</Message></Response>"
+_TWIML_EMPTY = b'<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+# Message text is element content, so only &, < and > need escaping.
+_escape = partial(html.escape, quote=False)
 
 
-class TelegramWebhook(BaseModel):
-    chat_id: str
-    text: str
-    username: Optional[str] = None
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    global _policy_ingestor
+    loop = asyncio.get_running_loop()
+    try:
+        app.state.orchestrator = await loop.run_in_executor(None, build_orchestrator)
+    except Exception as exc:  # noqa: BLE001 - fall back to building on first request
+        logger.warning("orchestrator.preload_failed", error=str(exc))
+        app.state.orchestrator = None
+    app.state.media_ingestor = GroqMediaIngestor(get_settings())
+    try:
+        _policy_ingestor = PolicyIngestor(cfg=IngestCfg.from_settings(get_settings()))
+    except RuntimeError as exc:
+        logger.warning("policy_ingestor.preload_failed", error=str(exc))
+    app.state.client_cache = OrderedDict()
+    app.state.refresh_states = OrderedDict()
+    yield
+    await app.state.media_ingestor.aclose()
+    if app.state.orchestrator is not None:
+        await app.state.orchestrator.aclose()
+    shutdown_gmail_executor()
+    shutdown_extract_pool()
 
 
 configure_logging()
-app = FastAPI(title="Ancileo Conversational Insurance Platform", version="0.1.0")
+app = FastAPI(
+    title="Ancileo Conversational Insurance Platform",
+    version="0.1.0",
+    lifespan=lifespan,
+)
 settings = get_settings()
 app.add_middleware(SessionMiddleware, secret_key=settings.session_secret, same_site="lax")
 mount_integration_static(app)
@@ -104,40 +99,27 @@ mount_gmail_static(app)
 app.include_router(integration_router)
 app.include_router(gmail_router)
 
-_orchestrator: ConversationalOrchestrator | None = None
-_media_ingestor: GroqMediaIngestor | None = None
 _policy_ingestor: PolicyIngestor | None = None
 app.state.settings = settings
-app.state.orchestrator = None
-
-
-def get_orchestrator() -> ConversationalOrchestrator:
-    global _orchestrator
-    if _orchestrator is not None:
-        return _orchestrator
 
-    existing = getattr(app.state, "orchestrator", None)
-    if isinstance(existing, ConversationalOrchestrator):
-        _orchestrator = existing
-        return _orchestrator
 
-    _orchestrator = build_orchestrator()
-    app.state.orchestrator = _orchestrator
-    return _orchestrator
+async def get_orchestrator(request: Request) -> ConversationalOrchestrator:
+    orchestrator = getattr(request.app.state, "orchestrator", None)
+    if orchestrator is None:
+        # Startup preload failed; build off the event loop on first use.
+        orchestrator = await run_in_threadpool(ensure_orchestrator, request.app.state)
+    return orchestrator
 
 
-def get_config() -> Settings:
+async def get_config() -> Settings:
     return get_settings()
 
 
-def get_media_ingestor() -> GroqMediaIngestor:
-    global _media_ingestor
-    if _media_ingestor is None:
-        _media_ingestor = GroqMediaIngestor(get_settings())
-    return _media_ingestor
+async def get_media_ingestor(request: Request) -> GroqMediaIngestor:
+    return request.app.state.media_ingestor
 
 
-def get_policy_ingestor(settings: Settings = Depends(get_config)) -> PolicyIngestor:
+async def get_policy_ingestor(settings: Settings = Depends(get_config)) -> PolicyIngestor:
     global _policy_ingestor
     if _policy_ingestor is None:
         cfg = IngestCfg.from_settings(settings)
@@ -145,6 +127,17 @@ def get_policy_ingestor(settings: Settings = Depends(get_config)) -> PolicyInges
     return _policy_ingestor
 
 
+def _copy_upload_to_temp(upload: IO[bytes]) -> Optional[str]:
+    """Copy an uploaded PDF to a named temp file, returning ``None`` when empty."""
+
+    if upload.seek(0, os.SEEK_END) == 0:
+        return None
+    upload.seek(0)
+    with NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        shutil.copyfileobj(upload, tmp_file, length=1 << 20)
+        return tmp_file.name
+
+
 def _persist_taxonomy_payload(
     *,
     product_label: str,
@@ -212,22 +205,21 @@ async def chat_endpoint(
         channel=payload.channel,
     )
 
-    return ChatResponse(**response)
+    # ``response_model`` validates the orchestrator payload once on the way out.
+    return response
 
 
 @app.post("/tools/policy/index")
 async def rebuild_policy_index(
     request: IngestRequest,
     background: BackgroundTasks,
-):
+) -> Dict[str, str]:
     _ = request, background
     logger.info("policy_index.rebuild.skipped", reason="agent_does_not_require_index")
-    return JSONResponse(
-        {
-            "status": "skipped",
-            "message": "Policy research agent loads taxonomy data directly and does not require indexing.",
-        }
-    )
+    return {
+        "status": "skipped",
+        "message": "Policy research agent loads taxonomy data directly and does not require indexing.",
+    }
 
 
 @app.get("/healthz")
@@ -254,16 +246,11 @@ async def extract_taxonomy_endpoint(
     if not filename.endswith(".pdf") and "pdf" not in content_type:
         raise HTTPException(status_code=415, detail="Only PDF policy documents are supported")
 
-    data = await pdf.read()
-    if not data:
+    temp_path = await run_in_threadpool(_copy_upload_to_temp, pdf.file)
+    if temp_path is None:
         raise HTTPException(status_code=400, detail="Uploaded PDF is empty")
 
-    temp_path: str | None = None
     try:
-        with NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(data)
-            temp_path = tmp_file.name
-
         result = await run_in_threadpool(
             extract_all_layers,
             temp_path,
@@ -302,7 +289,7 @@ async def whatsapp_webhook(
     media_ingestor: GroqMediaIngestor = Depends(get_media_ingestor),
 ):
     form_data = await request.form()
-    payload: Dict[str, str] = {key: value for key, value in form_data.items()}
+    payload: Dict[str, str] = dict(form_data)
     message = WhatsAppMessage.from_twilio_payload(payload)
 
     metadata = message.metadata or {}
@@ -325,28 +312,15 @@ async def whatsapp_webhook(
         attachments=len(message.attachments),
     )
 
-    media_attachments = [
-        MediaAttachment(
-            url=attachment.url,
-            content_type=attachment.content_type,
-            filename=attachment.filename,
-            media_sid=attachment.media_sid,
-        )
-        for attachment in message.attachments
-    ]
-
-    attachment_summaries = await media_ingestor.analyse(media_attachments)
+    attachment_summaries = await media_ingestor.analyse(message.attachments)
 
     user_message = message.text.strip()
 
     if attachment_summaries:
-        insights = []
-        for index, summary in enumerate(attachment_summaries, start=1):
-            label = f"Attachment {index}"
-            summary_text = summary or "No insight available."
-            insights.append(f"[{label}] {summary_text}")
-
-        insights_block = "\n\n".join(insights)
+        insights_block = "\n\n".join(
+            f"[Attachment {index}] {summary or 'No insight available.'}"
+            for index, summary in enumerate(attachment_summaries, start=1)
+        )
         if user_message:
             user_message = f"{user_message}\n\n[Attachment Insights]\n{insights_block}"
         else:
@@ -362,23 +336,21 @@ async def whatsapp_webhook(
     )
 
     reply_text = response.get("output", "")
-    twiml = _render_twiml(reply_text)
-    return Response(content=twiml, media_type="application/xml")
+    return Response(content=_render_twiml(reply_text), media_type="application/xml; charset=utf-8")
 
 
-def _render_twiml(message: str) -> str:
-    escaped = html.escape(message or "")
-    return (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
-        f"<Response><Message>{escaped}</Message></Response>"
-    )
+def _render_twiml(message: str) -> bytes:
+    if not message:
+        # Twilio rejects empty <Message> bodies; an empty <Response> sends nothing.
+        return _TWIML_EMPTY
+    return _TWIML_PROLOG + _escape(message).encode("utf-8") + _TWIML_EPILOG
 
 
 @app.post("/webhooks/telegram")
 async def telegram_webhook(
     payload: TelegramWebhook,
     orchestrator: ConversationalOrchestrator = Depends(get_orchestrator),
-):
+) -> Dict[str, str]:
     response = await orchestrator.handle_message(
         session_id=payload.chat_id,
         user_message=payload.text,
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import base64
+import json
 import re
 from dataclasses import dataclass
 from datetime import date, datetime
+from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional
 
-from bs4 import BeautifulSoup
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
 from googleapiclient.errors import HttpError
+from selectolax.lexbor import LexborHTMLParser
 from google.oauth2.credentials import Credentials
 from email.utils import parsedate_to_datetime
 
@@ -29,24 +32,37 @@ DATE_FORMATS: tuple[str, ...] = (
     "%b %d, %Y",
     "%B %d, %Y",
 )
+ISO_DATE_FORMATS: tuple[str, ...] = ("%Y-%m-%d",)
+SLASH_DATE_FORMATS: tuple[str, ...] = ("%d/%m/%Y",)
+DASH_DATE_FORMATS: tuple[str, ...] = ("%d-%m-%Y",)
+DAY_FIRST_DATE_FORMATS: tuple[str, ...] = ("%d %b %Y", "%d %B %Y")
+MONTH_FIRST_DATE_FORMATS: tuple[str, ...] = ("%b %d, %Y", "%B %d, %Y")
+ORDINAL_SUFFIX_PATTERN = re.compile(r"(?<=\d)(?:st|nd|rd|th)\b", re.IGNORECASE)
 
 CURRENCY_PATTERN = re.compile(
-    r"(?P<currency>SGD|USD|EUR|GBP|AUD|CAD|JPY|MYR|THB|IDR|INR|PHP)\s?(?P<amount>[\d,]+(?:\.\d{2})?)",
+    r"(?P<currency>SGD|USD|EUR|GBP|AUD|CAD|JPY|MYR|THB|IDR|INR|PHP)\s?(?P<amount>[\d,]{1,15}(?:\.\d{2})?)",
     re.IGNORECASE,
 )
+# Free-text captures start on a letter and are length-bounded so the scan stays
+# linear on long email bodies.
 DESTINATION_PATTERNS: tuple[re.Pattern[str], ...] = (
     re.compile(r"Destination\s*[:\-]\s*(?P<value>.+)", re.IGNORECASE),
     re.compile(r"To\s*[:\-]\s*(?P<value>.+)", re.IGNORECASE),
-    re.compile(r"Arriving\s+in\s+(?P<value>[A-Za-z\s]+)", re.IGNORECASE),
+    re.compile(r"Arriving\s+in\s+(?P<value>[A-Za-z][A-Za-z\s]{0,59})", re.IGNORECASE),
 )
 FALLBACK_DESTINATION_PATTERN = re.compile(
-    r"(?:flight|trip|travel|journey|itinerary)\s+(?:to|for)\s+(?P<value>[A-Za-z\s]{3,})",
+    r"(?:flight|trip|travel|journey|itinerary)\s+(?:to|for)\s+(?P<value>[A-Za-z][A-Za-z\s]{2,59})",
     re.IGNORECASE,
 )
 DATE_TOKEN_PATTERN = re.compile(
     r"\b(\d{4}-\d{2}-\d{2}|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|[A-Za-z]{3,9}\s+\d{1,2},\s*\d{4})\b"
 )
 DATE_CONTEXT_WINDOW = 35
+BODY_MIME_PREFERENCE: tuple[str, ...] = ("text/plain", "text/html")
+MAX_BODY_BYTES = 64 * 1024
+NON_TEXT_TAGS: list[str] = ["script", "style", "template"]
+RETURN_CONTEXT_PATTERN = re.compile(r"return|arrive|back|inbound|home", re.IGNORECASE)
+DEPART_CONTEXT_PATTERN = re.compile(r"depart|outbound|leave|start|fly out", re.IGNORECASE)
 TRIP_TYPE_HINTS: tuple[tuple[str, str], ...] = (
     ("one-way", "single"),
     ("one way", "single"),
@@ -74,7 +90,7 @@ def fetch_travel_client(
     """Fetch recent travel-related emails and build a client profile."""
 
     try:
-        service = build("gmail", "v1", credentials=credentials, cache_discovery=False)
+        service = build_from_document(_gmail_discovery_document(), credentials=credentials)
     except Exception as exc:  # pragma: no cover - googleapiclient discovery errors
         raise GmailDataError("Unable to initialise Gmail service") from exc
 
@@ -122,21 +138,7 @@ def fetch_travel_client(
     message_ids: Iterable[Dict[str, Any]] = response.get("messages", []) if response else []
 
     trips: List[TripDetails] = []
-    for message_meta in message_ids:
-        message_id = message_meta.get("id")
-        if not message_id:
-            continue
-        try:
-            message = (
-                service.users()
-                .messages()
-                .get(userId="me", id=message_id, format="full")
-                .execute()
-            )
-        except HttpError as exc:  # pragma: no cover - requires Gmail connectivity
-            logger.warning("gmail.message.fetch_failed", message_id=message_id, error=str(exc))
-            continue
-
+    for message in _batch_get_messages(service, message_ids):
         candidate = _parse_trip_candidate(message)
         if candidate is None:
             continue
@@ -152,9 +154,50 @@ def fetch_travel_client(
     return client
 
 
+@lru_cache(maxsize=1)
+def _gmail_discovery_document() -> Dict[str, Any]:
+    """Parse the bundled Gmail discovery document once per process."""
+
+    content = discovery_cache.get_static_doc("gmail", "v1")
+    if not content:  # pragma: no cover - bundled with googleapiclient
+        raise GmailDataError("Gmail discovery document is unavailable")
+    return json.loads(content)
+
+
+def _batch_get_messages(service: Any, message_ids: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fetch full messages in a single batch request, preserving list order."""
+
+    # Batch request ids must be unique.
+    ordered_ids = list(dict.fromkeys(meta.get("id") for meta in message_ids if meta.get("id")))
+    if not ordered_ids:
+        return []
+
+    fetched: Dict[str, Dict[str, Any]] = {}
+
+    def _collect(request_id: str, message: Optional[Dict[str, Any]], exc: Optional[Exception]) -> None:
+        if exc is not None:
+            logger.warning("gmail.message.fetch_failed", message_id=request_id, error=str(exc))
+            return
+        if message:
+            fetched[request_id] = message
+
+    batch = service.new_batch_http_request(callback=_collect)
+    messages_api = service.users().messages()
+    for message_id in ordered_ids:
+        batch.add(messages_api.get(userId="me", id=message_id, format="full"), request_id=message_id)
+
+    try:
+        batch.execute()
+    except HttpError as exc:  # pragma: no cover - requires Gmail connectivity
+        logger.exception("gmail.messages.batch_failed", error=str(exc))
+        raise GmailDataError("Unable to fetch Gmail messages") from exc
+
+    return [fetched[message_id] for message_id in ordered_ids if message_id in fetched]
+
+
 def _parse_trip_candidate(message: Dict[str, Any]) -> Optional[GmailTripCandidate]:
     payload = message.get("payload", {})
-    headers = {header.get("name", "").lower(): header.get("value", "") for header in payload.get("headers", [])}
+    headers, safe_headers = _split_headers(payload.get("headers", []))
     subject = headers.get("subject", "")
     date_header = headers.get("date", "")
     sent_at = _parse_datetime(date_header)
@@ -175,7 +218,7 @@ def _parse_trip_candidate(message: Dict[str, Any]) -> Optional[GmailTripCandidat
         "sentAt": sent_at.isoformat() if sent_at else None,
         "gmailMessageId": message.get("id"),
         "threadId": message.get("threadId"),
-        "headers": _safe_headers(payload.get("headers", [])),
+        "headers": safe_headers,
         "messageUrl": message_url or None,
     }
 
@@ -207,26 +250,32 @@ def _extract_body_text(payload: Dict[str, Any]) -> str:
         return decoded
 
     parts = payload.get("parts", [])
-    for part in parts:
-        part_type = part.get("mimeType")
-        if part_type in {"text/plain", "text/html"}:
-            text = _extract_body_text(part)
-            if text:
-                return text
+    # Plain text avoids the HTML parser entirely, so try it before text/html.
+    for wanted in BODY_MIME_PREFERENCE:
+        for part in parts:
+            if part.get("mimeType") == wanted:
+                text = _extract_body_text(part)
+                if text:
+                    return text
     return ""
 
 
 def _decode_body(data: str) -> str:
     try:
-        decoded_bytes = base64.urlsafe_b64decode(data.encode("utf-8"))
+        # Only decode the leading MAX_BODY_BYTES; the parsers never need more.
+        encoded = data[: (MAX_BODY_BYTES // 3) * 4]
+        decoded_bytes = base64.urlsafe_b64decode(encoded.encode("utf-8"))
         return decoded_bytes.decode("utf-8", errors="ignore")
     except Exception:  # pragma: no cover - defensive
         return ""
 
 
 def _html_to_text(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(separator="\n", strip=True)
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(NON_TEXT_TAGS)
+    if tree.root is None:
+        return ""
+    return tree.root.text(separator="\n", strip=True)
 
 
 def _extract_destination(text: str) -> Optional[str]:
@@ -255,13 +304,12 @@ def _extract_dates(text: str) -> tuple[Optional[date], Optional[date]]:
             continue
 
         context_start = max(0, match.start() - DATE_CONTEXT_WINDOW)
-        context = text[context_start:match.start()].lower()
-        if any(keyword in context for keyword in ("return", "arrive", "back", "inbound", "home")):
+        if RETURN_CONTEXT_PATTERN.search(text, context_start, match.start()):
             if end is None or parsed > end:
                 end = parsed
             continue
 
-        if any(keyword in context for keyword in ("depart", "outbound", "leave", "start", "fly out")):
+        if DEPART_CONTEXT_PATTERN.search(text, context_start, match.start()):
             if start is None or parsed < start:
                 start = parsed
             continue
@@ -278,9 +326,8 @@ def _extract_dates(text: str) -> tuple[Optional[date], Optional[date]]:
 
 
 def _parse_date(value: str) -> Optional[date]:
-    cleaned = value.strip()
-    cleaned = re.sub(r"(st|nd|rd|th)", "", cleaned)
-    for fmt in DATE_FORMATS:
+    cleaned = ORDINAL_SUFFIX_PATTERN.sub("", value.strip())
+    for fmt in _candidate_formats(cleaned):
         try:
             dt = datetime.strptime(cleaned, fmt)
             # Two-digit year handling
@@ -292,6 +339,23 @@ def _parse_date(value: str) -> Optional[date]:
     return None
 
 
+def _candidate_formats(cleaned: str) -> tuple[str, ...]:
+    # Pick formats from the token shape so most tokens hit on the first strptime.
+    if not cleaned:
+        return ()
+    if len(cleaned) > 4 and cleaned[4] == "-" and cleaned[:4].isdigit():
+        return ISO_DATE_FORMATS
+    if cleaned[0].isdigit():
+        if "/" in cleaned:
+            return SLASH_DATE_FORMATS
+        if "-" in cleaned:
+            return DASH_DATE_FORMATS
+        return DAY_FIRST_DATE_FORMATS
+    if cleaned[0].isalpha():
+        return MONTH_FIRST_DATE_FORMATS
+    return DATE_FORMATS
+
+
 def _infer_trip_type(text: str, start: Optional[date], end: Optional[date]) -> Optional[str]:
     lowered = text.lower()
     for marker, trip_type in TRIP_TYPE_HINTS:
@@ -316,15 +380,21 @@ def _extract_cost(text: str) -> Optional[float]:
         return None
 
 
-def _safe_headers(headers: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _split_headers(
+    headers: Iterable[Dict[str, Any]],
+) -> tuple[Dict[str, str], List[Dict[str, Any]]]:
+    """Return a lowercase name lookup and the named headers in one pass."""
+
+    lookup: Dict[str, str] = {}
     safe: List[Dict[str, Any]] = []
     for header in headers:
         name = header.get("name")
-        value = header.get("value")
         if not name:
             continue
+        value = header.get("value")
+        lookup[name.lower()] = value or ""
         safe.append({"name": name, "value": value})
-    return safe
+    return lookup, safe
 
 
 def _parse_datetime(raw: str) -> Optional[datetime]:
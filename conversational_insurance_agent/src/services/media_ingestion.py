@@ -2,18 +2,48 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import hashlib
+import shutil
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from io import BytesIO
-from typing import List, Optional
+from tempfile import SpooledTemporaryFile
+from typing import IO, Dict, List, Optional, Sequence, Tuple, Union
 
 import httpx
-import pdfplumber
+import pymupdf
 from groq import Groq
+from PIL import Image
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 from ..config import Settings, get_settings
 from ..utils.logging import logger
 
 
+MAX_CONCURRENT_ANALYSES = 8
+MEDIA_SPOOL_MAX_MEMORY = 1 << 20
+MEDIA_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MEDIA_MAX_BYTES = 20 * 1024 * 1024
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+MEDIA_SUMMARY_CACHE_SIZE = 512
+IMAGE_MAX_DIMENSION = 1280
+IMAGE_JPEG_QUALITY = 82
+PDF_TEXT_LIMIT = 8000
+PDF_MAX_PAGES = 15
+PDF_MIN_TEXT_CHARS = 40
+PDF_PROMPT_TOKEN_BUDGET = 1500
+APPROX_CHARS_PER_TOKEN = 4
+PDF_EXTRACT_BUDGET_SECONDS = 5.0
+PDFTOTEXT_MIN_BYTES = 1_000_000
+
+
 @dataclass
 class MediaAttachment:
     url: str
@@ -34,33 +64,150 @@ class MediaDownloadUnauthorizedError(MediaDownloadError):
         super().__init__(status_code=401, url=url)
 
 
+class MediaTooLargeError(MediaDownloadError):
+    def __init__(self, *, url: str) -> None:
+        super().__init__(status_code=413, url=url)
+
+
+IMAGE_SYSTEM_MESSAGE: Dict[str, str] = {
+    "role": "system",
+    "content": (
+        "You are an assistant that analyses user provided media to "
+        "extract concise, factual details relevant to travel insurance."
+    ),
+}
+IMAGE_INSTRUCTION: Dict[str, str] = {
+    "type": "text",
+    "text": (
+        "Provide a short bullet list (max 4 bullets) summarising the "
+        "key information visible in this image that could support a "
+        "travel insurance enquiry or claim."
+    ),
+}
+PDF_SYSTEM_MESSAGE: Dict[str, str] = {
+    "role": "system",
+    "content": (
+        "You condense uploaded travel documents into actionable insights "
+        "for an insurance concierge."
+    ),
+}
+PDF_PROMPT = (
+    "Summarise the key facts from this travel-related document. Focus on "
+    "dates, destinations, travellers, costs, incidents, or coverage details "
+    "relevant for insurance support. Present the summary as bullet points."
+)
+
+
+def _is_transient_download_error(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, MediaDownloadError) and exc.status_code >= 500
+
+
+def _truncate_to_token_budget(text: str, budget: int) -> str:
+    """Trim ``text`` to roughly ``budget`` tokens without splitting a word."""
+
+    limit = budget * APPROX_CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    newline = text.rfind("\n", 0, limit + 1)
+    cut = max(cut, newline)
+    return text[: cut if cut > 0 else limit].rstrip()
+
+
+def _downscale_image(image: IO[bytes], content_type: str) -> Tuple[IO[bytes], str]:
+    """Shrink oversized images to ``IMAGE_MAX_DIMENSION`` before base64 encoding."""
+
+    try:
+        with Image.open(image) as picture:
+            if max(picture.size) <= IMAGE_MAX_DIMENSION:
+                image.seek(0)
+                return image, content_type
+            # JPEG decoders can subsample while decoding, which is far cheaper than a full decode.
+            picture.draft("RGB", (IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+            picture.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION), Image.Resampling.LANCZOS)
+            if picture.mode != "RGB":
+                picture = picture.convert("RGB")
+            output = BytesIO()
+            picture.save(output, format="JPEG", quality=IMAGE_JPEG_QUALITY)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("groq_media.image_downscale_failed", error=str(exc))
+        image.seek(0)
+        return image, content_type
+    output.seek(0)
+    return output, "image/jpeg"
+
+
 class GroqMediaIngestor:
     def __init__(self, settings: Optional[Settings] = None) -> None:
         self._settings = settings or get_settings()
         self._client = Groq(api_key=self._settings.groq_api_key)
+        self._vision_model = self._settings.groq_vision_model
+        self._text_model = self._settings.groq_model
         self._missing_twilio_auth_logged = False
+        self._analysis_slots = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        self._summary_cache: OrderedDict[Tuple[bytes, str, str], str] = OrderedDict()
+        self._twilio_auth = self._build_twilio_auth()
+        self._pdftotext_path = shutil.which("pdftotext")
+        self._http = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
-    async def analyse(self, attachments: List[MediaAttachment]) -> List[str]:
+    async def analyse(self, attachments: Sequence[MediaAttachment]) -> List[str]:
         if not attachments:
             return []
 
-        tasks = [self._analyse_single(attachment) for attachment in attachments]
+        outcomes = await asyncio.gather(
+            *(self._analyse_bounded(attachment) for attachment in attachments),
+            return_exceptions=True,
+        )
         results: List[str] = []
-        for attachment, task in zip(attachments, tasks):
-            try:
-                results.append(await task)
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.exception(
+        for attachment, outcome in zip(attachments, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(
                     "groq_media.analysis_failed",
                     media_sid=attachment.media_sid,
                     content_type=attachment.content_type,
-                    error=str(exc),
+                    error=str(outcome),
+                    exc_info=outcome,
                 )
+                continue
+            results.append(outcome)
         return results
 
+    async def _analyse_bounded(self, attachment: MediaAttachment) -> str:
+        async with self._analysis_slots:
+            return await self._analyse_single(attachment)
+
     async def _analyse_single(self, attachment: MediaAttachment) -> str:
+        if (
+            self._twilio_auth is None
+            and attachment.content_type.startswith("image/")
+            and attachment.url.startswith("https://")
+        ):
+            # Unauthenticated media is publicly reachable, so let Groq fetch it directly.
+            try:
+                return await self._describe_image(attachment.url, attachment.content_type)
+            except Exception as exc:  # pragma: no cover - depends on remote fetch
+                logger.warning(
+                    "groq_media.remote_image_failed",
+                    media_sid=attachment.media_sid,
+                    error=str(exc),
+                )
+
         try:
-            data = await self._download(attachment.url)
+            data, digest = await self._download(attachment.url)
         except MediaDownloadUnauthorizedError:
             logger.warning(
                 "groq_media.download_unauthorized",
@@ -73,6 +220,18 @@ class GroqMediaIngestor:
                 "(HTTP 401 Unauthorized). Please check the configured Twilio credentials and "
                 "try sending the file again."
             )
+        except MediaTooLargeError:
+            logger.warning(
+                "groq_media.download_too_large",
+                media_sid=attachment.media_sid,
+                content_type=attachment.content_type,
+                url=attachment.url,
+                max_bytes=MEDIA_MAX_BYTES,
+            )
+            return (
+                "The uploaded file is too large for me to review. Please send a file "
+                f"smaller than {MEDIA_MAX_BYTES // (1024 * 1024)} MB."
+            )
         except MediaDownloadError as exc:
             logger.warning(
                 "groq_media.download_failed",
@@ -86,16 +245,34 @@ class GroqMediaIngestor:
                 f"{exc.status_code}). Please try sending the file again."
             )
 
-        if attachment.content_type.startswith("image/"):
-            return await self._describe_image(data, attachment.content_type)
-        if attachment.content_type.lower() == "application/pdf":
-            return await self._summarise_pdf(data, attachment.filename)
-        logger.warning(
-            "groq_media.unsupported_type",
-            content_type=attachment.content_type,
-            media_sid=attachment.media_sid,
-        )
-        return f"Received unsupported media type {attachment.content_type}."
+        content_type = attachment.content_type.lower()
+        # PDF summaries quote the document name, so the same bytes under another name miss.
+        cache_name = (attachment.filename or "") if content_type == "application/pdf" else ""
+        cache_key = (digest, content_type, cache_name)
+        cached = self._summary_cache.get(cache_key)
+        if cached is not None:
+            data.close()
+            self._summary_cache.move_to_end(cache_key)
+            return cached
+
+        with data:
+            if attachment.content_type.startswith("image/"):
+                summary = await self._describe_image(data, attachment.content_type)
+            elif attachment.content_type.lower() == "application/pdf":
+                summary = await self._summarise_pdf(data, attachment.filename)
+            else:
+                logger.warning(
+                    "groq_media.unsupported_type",
+                    content_type=attachment.content_type,
+                    media_sid=attachment.media_sid,
+                )
+                return f"Received unsupported media type {attachment.content_type}."
+
+        if summary:
+            self._summary_cache[cache_key] = summary
+            if len(self._summary_cache) > MEDIA_SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return summary
 
     def _build_twilio_auth(self) -> Optional[httpx.Auth]:
         if self._settings.twilio_account_sid and self._settings.twilio_auth_token:
@@ -103,15 +280,20 @@ class GroqMediaIngestor:
                 self._settings.twilio_account_sid,
                 self._settings.twilio_auth_token,
             )
-        if self._settings.twilio_api_key and self._settings.twilio_api_secret:
-            return httpx.BasicAuth(
-                self._settings.twilio_api_key,
-                self._settings.twilio_api_secret,
-            )
+        api_key = getattr(self._settings, "twilio_api_key", "")
+        api_secret = getattr(self._settings, "twilio_api_secret", "")
+        if api_key and api_secret:
+            return httpx.BasicAuth(api_key, api_secret)
         return None
 
-    async def _download(self, url: str) -> bytes:
-        auth = self._build_twilio_auth()
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.2, max=2) + wait_random(0, 0.2),
+        retry=retry_if_exception(_is_transient_download_error),
+        reraise=True,
+    )
+    async def _download(self, url: str) -> Tuple[IO[bytes], bytes]:
+        auth = self._twilio_auth
         if auth is None and not self._missing_twilio_auth_logged:
             self._missing_twilio_auth_logged = True
             logger.warning(
@@ -120,47 +302,54 @@ class GroqMediaIngestor:
                 has_auth_token=bool(self._settings.twilio_auth_token),
             )
 
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            response = await client.get(url, auth=auth)
-            try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                status_code = exc.response.status_code
-                if status_code == 401:
-                    raise MediaDownloadUnauthorizedError(url=url) from exc
-                raise MediaDownloadError(status_code=status_code, url=url) from exc
-            return response.content
-
-    async def _describe_image(self, data: bytes, content_type: str) -> str:
-        encoded = base64.b64encode(data).decode("utf-8")
-        data_url = f"data:{content_type};base64,{encoded}"
+        # Small files stay in memory; larger ones spill to disk while streaming.
+        spool = SpooledTemporaryFile(max_size=MEDIA_SPOOL_MAX_MEMORY)
+        hasher = hashlib.blake2b(digest_size=16)
+        try:
+            async with self._http.stream("GET", url, auth=auth) as response:
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as exc:
+                    status_code = exc.response.status_code
+                    if status_code == 401:
+                        raise MediaDownloadUnauthorizedError(url=url) from exc
+                    raise MediaDownloadError(status_code=status_code, url=url) from exc
+                declared = response.headers.get("content-length")
+                if declared and declared.isdigit() and int(declared) > MEDIA_MAX_BYTES:
+                    raise MediaTooLargeError(url=url)
+                received = 0
+                async for chunk in response.aiter_bytes(MEDIA_DOWNLOAD_CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > MEDIA_MAX_BYTES:
+                        raise MediaTooLargeError(url=url)
+                    spool.write(chunk)
+                    hasher.update(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool, hasher.digest()
 
+    async def _describe_image(self, image: Union[IO[bytes], str], content_type: str) -> str:
         def _call() -> str:
+            if isinstance(image, str):
+                image_url = image
+            else:
+                source, media_type = _downscale_image(image, content_type)
+                # Encode the spool in 3-byte-aligned chunks straight into the data URL buffer.
+                buffer = bytearray(f"data:{media_type};base64,".encode("ascii"))
+                for chunk in iter(lambda: source.read(BASE64_CHUNK_SIZE), b""):
+                    buffer += base64.b64encode(chunk)
+                image_url = buffer.decode("ascii")
             completion = self._client.chat.completions.create(
-                model=self._settings.groq_vision_model,
+                model=self._vision_model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an assistant that analyses user provided media to "
-                            "extract concise, factual details relevant to travel insurance."
-                        ),
-                    },
+                    IMAGE_SYSTEM_MESSAGE,
                     {
                         "role": "user",
                         "content": [
-                            {
-                                "type": "text",
-                                "text": (
-                                    "Provide a short bullet list (max 4 bullets) summarising the "
-                                    "key information visible in this image that could support a "
-                                    "travel insurance enquiry or claim."
-                                ),
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": data_url},
-                            },
+                            IMAGE_INSTRUCTION,
+                            {"type": "image_url", "image_url": {"url": image_url}},
                         ],
                     },
                 ],
@@ -172,38 +361,77 @@ class GroqMediaIngestor:
 
         return await asyncio.to_thread(_call)
 
-    async def _summarise_pdf(self, data: bytes, filename: Optional[str]) -> str:
+    async def _pdftotext(self, pdf_bytes: bytes) -> Optional[str]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self._pdftotext_path,
+                "-q",
+                "-l",
+                str(PDF_MAX_PAGES),
+                "-",
+                "-",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            logger.warning("groq_media.pdftotext_failed", error=str(exc))
+            return None
+        try:
+            stdout, _ = await asyncio.wait_for(
+                process.communicate(pdf_bytes),
+                timeout=PDF_EXTRACT_BUDGET_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.warning("groq_media.pdftotext_timeout")
+            return None
+        if process.returncode != 0:
+            logger.warning("groq_media.pdftotext_failed", returncode=process.returncode)
+            return None
+        return stdout.decode("utf-8", errors="replace")[:PDF_TEXT_LIMIT]
+
+    async def _summarise_pdf(self, data: IO[bytes], filename: Optional[str]) -> str:
+        pdf_bytes = data.read()
+
         def _extract_text() -> str:
             text_parts: List[str] = []
-            with pdfplumber.open(BytesIO(data)) as pdf:
-                for page in pdf.pages:
-                    text_parts.append(page.extract_text() or "")
-                    if len("\n".join(text_parts)) > 8000:
+            total = 0
+            deadline = time.monotonic() + PDF_EXTRACT_BUDGET_SECONDS
+            with pymupdf.open(stream=pdf_bytes, filetype="pdf") as document:
+                for page_number in range(min(document.page_count, PDF_MAX_PAGES)):
+                    text = document.load_page(page_number).get_text("text") or ""
+                    text_parts.append(text)
+                    total += len(text) + 1
+                    if total > PDF_TEXT_LIMIT:
+                        break
+                    if time.monotonic() > deadline:
+                        logger.warning("groq_media.pdf_extract_budget_exceeded", pages=page_number + 1)
                         break
             return "\n".join(text_parts)
 
-        raw_text = await asyncio.to_thread(_extract_text)
-        truncated = raw_text[:6000]
-        prompt = (
-            "Summarise the key facts from this travel-related document. Focus on "
-            "dates, destinations, travellers, costs, incidents, or coverage details "
-            "relevant for insurance support. Present the summary as bullet points."
-        )
+        raw_text: Optional[str] = None
+        if self._pdftotext_path and len(pdf_bytes) > PDFTOTEXT_MIN_BYTES:
+            raw_text = await self._pdftotext(pdf_bytes)
+        if raw_text is None:
+            raw_text = await asyncio.to_thread(_extract_text)
+        if len(raw_text.strip()) < PDF_MIN_TEXT_CHARS:
+            # Scanned or empty documents give Groq nothing to summarise.
+            return (
+                "The uploaded PDF appears to contain no extractable text. If it is a scan, "
+                "please send it as an image instead."
+            )
+        truncated = _truncate_to_token_budget(raw_text, PDF_PROMPT_TOKEN_BUDGET)
 
         def _call() -> str:
             completion = self._client.chat.completions.create(
-                model=self._settings.groq_model,
+                model=self._text_model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You condense uploaded travel documents into actionable insights "
-                            "for an insurance concierge."
-                        ),
-                    },
+                    PDF_SYSTEM_MESSAGE,
                     {
                         "role": "user",
-                        "content": f"{prompt}\n\nDocument name: {filename or 'uploaded document'}\n\n{truncated}",
+                        "content": f"{PDF_PROMPT}\n\nDocument name: {filename or 'uploaded document'}\n\n{truncated}",
                     },
                 ],
                 temperature=0.2,
@@ -2,21 +2,112 @@ from __future__ import annotations
 
 import inspect
 import json
+import time
+import uuid
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 import httpx
 import stripe
+from tenacity import (
+    retry,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 from ..config import get_settings
 from ..utils.logging import logger
 
 
+AUX_SERVICE_FAILURE_THRESHOLD = 5
+AUX_SERVICE_COOLDOWN_SECONDS = 30.0
+
+
+def _is_transient_http_error(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code >= 500
+
+
+@lru_cache(maxsize=1)
+def _build_stripe_http_client() -> Optional[Any]:
+    """Pick the Stripe async HTTP client once per process; ``None`` if unsupported."""
+
+    client = None
+
+    try:
+        from stripe.http_client import AsyncioClient  # type: ignore[attr-defined]
+    except Exception:  # pragma: no cover - compatibility shim
+        pass
+    else:
+        try:
+            client = AsyncioClient()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("payments.configure_async_client_failed", error=str(exc))
+            client = None
+
+    if client is None:
+        new_default_http_client = getattr(stripe, "new_default_http_client", None)
+        try:
+            from stripe import _http_client as stripe_http_client  # type: ignore[attr-defined]
+        except Exception:  # pragma: no cover - module absent in older sdks
+            stripe_http_client = None
+
+        fallback_factory = (
+            getattr(stripe_http_client, "new_http_client_async_fallback", None)
+            if stripe_http_client is not None
+            else None
+        )
+
+        if callable(new_default_http_client) and callable(fallback_factory):
+            try:
+                signature = inspect.signature(new_default_http_client)
+            except (TypeError, ValueError):
+                supports_async_kw = False
+            else:
+                supports_async_kw = "async_fallback_client" in signature.parameters
+            if supports_async_kw:
+                try:
+                    client = new_default_http_client(
+                        async_fallback_client=fallback_factory()
+                    )
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.warning("payments.configure_httpx_client_failed", error=str(exc))
+                    client = None
+
+    if client is None:
+        logger.warning("payments.async_http_client_unconfigured")
+    return client
+
+
 class PaymentGateway:
     def __init__(self) -> None:
         self._settings = get_settings()
+        self._session_service_url = f"{self._settings.payments_base_url}/payments/session"
+        self._status_url_prefix = f"{self._settings.payment_status_url}/"
+        self._aux_failures = 0
+        self._aux_open_until = 0.0
+        self._aux_probe_in_flight = False
+        # HTTP/2 is negotiated via ALPN, so plain-http service URLs stay on HTTP/1.1.
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+        )
         if self._settings.stripe_api_key:
             stripe.api_key = self._settings.stripe_api_key
-            self._configure_stripe_http_client()
+            client = _build_stripe_http_client()
+            if client is not None:
+                stripe.default_http_client = client
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
     async def create_checkout_session(
         self,
@@ -43,22 +134,31 @@ class PaymentGateway:
 
         logger.info("payments.create_session", plan_code=plan_code, amount=amount)
 
-        # Attempt via auxiliary payments service first
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(
-                    f"{self._settings.payments_base_url}/payments/session",
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return {
+        # Attempt via auxiliary payments service first, unless it has been failing
+        probe = self._aux_is_half_open()
+        if probe and self._aux_probe_in_flight:
+            logger.info("payments.session_service_skipped", reason="probe_in_flight")
+        elif time.monotonic() >= self._aux_open_until:
+            # Once the cooldown lapses only one caller probes; the rest go to Stripe until it settles.
+            self._aux_probe_in_flight = probe
+            try:
+                data = await self._post_session_service(payload)
+                result = {
                     "provider": data.get("provider", "stripe"),
                     "session_id": data["session_id"],
                     "checkout_url": data["checkout_url"],
                 }
-        except Exception as exc:  # noqa: BLE001 - bubble up after fallback
-            logger.warning("payments.session_service_failed", error=str(exc))
+            except Exception as exc:  # noqa: BLE001 - bubble up after fallback
+                logger.warning("payments.session_service_failed", error=str(exc))
+                self._record_aux_failure()
+            else:
+                self._aux_failures = 0
+                return result
+            finally:
+                if probe:
+                    self._aux_probe_in_flight = False
+        else:
+            logger.info("payments.session_service_skipped", reason="circuit_open")
 
         if not self._settings.stripe_api_key:
             raise RuntimeError("Unable to create payment session without Stripe credentials")
@@ -83,6 +183,8 @@ class PaymentGateway:
             cancel_url=cancel_url,
             customer_email=customer_email,
             metadata=sanitized_metadata,
+            # One key per checkout attempt: the SDK's own retries reuse it, separate purchases never do.
+            idempotency_key=str(uuid.uuid4()),
         )
 
         return {
@@ -93,14 +195,7 @@ class PaymentGateway:
 
     async def fetch_status(self, session_id: str) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self._settings.payment_status_url}/{session_id}",
-                )
-                if response.status_code == 404:
-                    raise LookupError("Payment session not found")
-                response.raise_for_status()
-                return response.json()
+            return await self._get_session_status(session_id)
         except Exception as exc:  # noqa: BLE001
             logger.warning("payments.fetch_status_fallback", error=str(exc))
 
@@ -110,53 +205,47 @@ class PaymentGateway:
         session = await self._checkout_session_call("retrieve", id=session_id)
         return {"id": session.id, "status": session.status, "payment_status": session.payment_status}
 
-    def _configure_stripe_http_client(self) -> None:
-        client = None
+    def _record_aux_failure(self) -> None:
+        self._aux_failures += 1
+        if self._aux_failures >= AUX_SERVICE_FAILURE_THRESHOLD:
+            # Stays at the threshold, so one failed probe after the cooldown reopens the circuit.
+            self._aux_open_until = time.monotonic() + AUX_SERVICE_COOLDOWN_SECONDS
+            logger.warning("payments.session_service_circuit_open", failures=self._aux_failures)
 
-        try:
-            from stripe.http_client import AsyncioClient  # type: ignore[attr-defined]
-        except Exception:  # pragma: no cover - compatibility shim
-            pass
-        else:
-            try:
-                client = AsyncioClient()
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.warning("payments.configure_async_client_failed", error=str(exc))
-                client = None
-
-        if client is None:
-            new_default_http_client = getattr(stripe, "new_default_http_client", None)
-            try:
-                from stripe import _http_client as stripe_http_client  # type: ignore[attr-defined]
-            except Exception:  # pragma: no cover - module absent in older sdks
-                stripe_http_client = None
+    def _aux_is_half_open(self) -> bool:
+        return self._aux_failures >= AUX_SERVICE_FAILURE_THRESHOLD
 
-            fallback_factory = (
-                getattr(stripe_http_client, "new_http_client_async_fallback", None)
-                if stripe_http_client is not None
-                else None
-            )
+    # Session creation is not idempotent, so only retry when the request never left.
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.2, max=2) + wait_random(0, 0.2),
+        retry=retry_if_exception_type((httpx.ConnectError, httpx.ConnectTimeout)),
+        reraise=True,
+    )
+    async def _post_session_service(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._http.post(
+            self._session_service_url,
+            json=payload,
+            timeout=15.0,
+        )
+        response.raise_for_status()
+        return response.json()
 
-            if callable(new_default_http_client) and callable(fallback_factory):
-                try:
-                    signature = inspect.signature(new_default_http_client)
-                except (TypeError, ValueError):
-                    supports_async_kw = False
-                else:
-                    supports_async_kw = "async_fallback_client" in signature.parameters
-                if supports_async_kw:
-                    try:
-                        client = new_default_http_client(
-                            async_fallback_client=fallback_factory()
-                        )
-                    except Exception as exc:  # pragma: no cover - defensive
-                        logger.warning("payments.configure_httpx_client_failed", error=str(exc))
-                        client = None
-
-        if client is not None:
-            stripe.default_http_client = client
-        else:
-            logger.warning("payments.async_http_client_unconfigured")
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.2, max=2) + wait_random(0, 0.2),
+        retry=retry_if_exception(_is_transient_http_error),
+        reraise=True,
+    )
+    async def _get_session_status(self, session_id: str) -> Dict[str, Any]:
+        response = await self._http.get(
+            self._status_url_prefix + session_id,
+            timeout=10.0,
+        )
+        if response.status_code == 404:
+            raise LookupError("Payment session not found")
+        response.raise_for_status()
+        return response.json()
 
     async def _checkout_session_call(self, method_name: str, **kwargs: Any) -> Any:
         session_cls = stripe.checkout.Session
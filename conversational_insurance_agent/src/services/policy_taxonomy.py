@@ -2,16 +2,35 @@ from __future__ import annotations
 
 """Utilities for extracting structured taxonomy layers from policy PDFs."""
 
+import hashlib
 import json
+import multiprocessing
 import os
+import random
 import re
+import threading
 import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Tuple
 
+import orjson
 import pdfplumber
-from groq import Groq
-from jsonschema import Draft7Validator, ValidationError
+import pymupdf
+from groq import APIStatusError, Groq
+from jsonschema import Draft7Validator
+
+try:
+    import jsonschema_rs
+except ImportError:  # pragma: no cover - optional compiled validator
+    jsonschema_rs = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - optional PDF backend
+    pdfium = None
 
 from ..config import Settings, get_settings
 from ..utils.logging import logger
@@ -26,6 +45,12 @@ class IngestCfg:
     temperature: float = 0.1
     retries: int = 3
     max_tokens: int = 2200
+    fused_max_tokens: int = 6600
+    fuse_layers: bool = True
+    pdf_backend: Literal["pymupdf", "pypdfium2", "pdfplumber"] = "pymupdf"
+    cache_dir: str = os.getenv("POLICY_TAXONOMY_CACHE_DIR", "")
+    cache_enabled: bool = True
+    page_cache_dir: str = os.getenv("POLICY_PAGE_CACHE_DIR", "")
 
     @classmethod
     def from_settings(cls, settings: Settings | None = None) -> "IngestCfg":
@@ -122,23 +147,327 @@ L3_SCHEMA: Dict[str, Any] = {
 }
 
 
+SYS_L1 = (
+    "Extract Layer 1: General Conditions from travel-insurance policy text.\n"
+    "Return STRICT JSON ONLY (no prose or code fences).\n"
+    "Each item MUST have:\n"
+    '{\n'
+    '  "condition": "<snake_case_name>",\n'
+    '  "condition_type": "eligibility" | "exclusion",\n'
+    '  "products": {\n'
+    '    "<product_label>": {\n'
+    '      "condition_exist": true/false,\n'
+    '      "original_text": "exact policy wording",\n'
+    '      "parameters": {\n'
+    '        // key-value pairs capturing explicit criteria or thresholds found in the text\n'
+    '        // e.g., {"age_limit": "12 years", "requires_parent_guardian": true, "territory": "worldwide"}\n'
+    '      }\n'
+    '    }\n'
+    '  }\n'
+    '}\n'
+    "Do not leave 'parameters' empty unless no measurable or categorical detail exists. "
+    "Infer structured keys such as age, duration, distance, monetary thresholds, frequency, or role requirements. "
+    "Your output MUST conform exactly to the JSON shape described ? do not change field names or omit fields. "
+    "Only vary the contents of the 'parameters' object as key-value pairs."
+)
+
+
+SYS_L2 = (
+    "Extract Layer 2: ALL coverage benefits and their limits/qualifiers from the policy text.\n"
+    "Return STRICT JSON ONLY (no prose, no code fences).\n"
+    "Each array item MUST be exactly:\n"
+    '{\n'
+    '  "benefit_name": "<snake_case_identifier>",\n'
+    '  "parameters": [],\n'
+    '  "products": { "<product_label>": {\n'
+    '      "condition_exist": true/false,\n'
+    '      "parameters": {\n'
+    '        "coverage_limit": "<amount or descriptor if present>",\n'
+    '        "sub_limits": { /* zero or more key-value pairs that appear in the text */ }\n'
+    '      }\n'
+    '  }}\n'
+    '}\n'
+    "Rules:\n"
+    "- Discover EVERY benefit section present (e.g., medical expenses, trip cancellation, delay, baggage, personal liability,\n"
+    "  evacuation, adventurous activities, rental vehicle excess, etc.).\n"
+    "- Use short, machine-friendly snake_case for benefit_name (e.g., trip_cancellation, delayed_baggage, personal_liability).\n"
+    "- If a coverage cap exists, put it in coverage_limit (keep units/format from text); if none is stated, omit that field or set a descriptive value.\n"
+    "- Put any nested caps/thresholds/waiting_periods/deductibles/percentages into sub_limits as key-value pairs (only if present in the text).\n"
+    "- Do NOT invent keys. Use exact facts. If a field isn?t present in the text, leave it out.\n"
+    "- Your output MUST conform exactly to the JSON shape above: only vary the contents of the 'parameters' object."
+)
+
+
+SYS_L3 = (
+    "Extract Layer 3: Benefit-specific conditions (eligibilities/exclusions) tied to EACH benefit.\n"
+    "Return STRICT JSON ONLY (no prose, no code fences).\n"
+    "Each array item MUST be exactly:\n"
+    '{\n'
+    '  "benefit_name": "<parent_benefit_snake_case>",\n'
+    '  "condition": "<specific_condition_snake_case>",\n'
+    '  "condition_type": "benefit_eligibility" | "benefit_exclusion",\n'
+    '  "parameters": [],\n'
+    '  "products": { "<product_label>": {\n'
+    '      "condition_exist": true/false,\n'
+    '      "original_text": "minimal exact quote from the policy",\n'
+    '      "parameters": { /* zero or more key-value pairs present in the text */ }\n'
+    '  }}\n'
+    '}\n'
+    "Rules:\n"
+    "- For EACH benefit discovered in Layer 2, find its explicit conditions (e.g., time limits, documentation requirements,\n"
+    "  minimum thresholds, known-circumstance exclusions, activity/location qualifiers, age rules, waiting periods, deductibles, etc.).\n"
+    "- Use short snake_case names for both benefit_name and condition, reflecting the policy?s wording.\n"
+    "- In 'products.<product_label>.parameters', include ONLY measurable/categorical keys that appear in the text\n"
+    "  (e.g., {\"time_limit\":\"90 days\", \"minimum_amount\":\"$500\", \"requires_doctor_note\":true}).\n"
+    "- Do NOT invent keys. Only include parameters present in the text. Preserve units/format.\n"
+    "- Your output MUST conform exactly to the JSON shape above; only vary the contents of the 'parameters' object."
+)
+
+
+SYS_ALL = (
+    "Extract all three taxonomy layers from travel-insurance policy text in one pass.\n"
+    "Return STRICT JSON ONLY (no prose or code fences): a single object with exactly the keys "
+    '"layer_1", "layer_2" and "layer_3", each holding an array whose items follow the rules '
+    "for that layer below.\n\n"
+    "### layer_1\n"
+    + SYS_L1
+    + "\n\n### layer_2\n"
+    + SYS_L2
+    + "\n\n### layer_3\n"
+    + SYS_L3
+)
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Any:
+    # Prefer the compiled Rust validator; both expose iter_errors() yielding errors with .message.
+    if jsonschema_rs is not None:
+        return jsonschema_rs.Draft7Validator(schema)
+    return Draft7Validator(schema)
+
+
+L1_VALIDATOR = _compile_validator(L1_SCHEMA)
+L2_VALIDATOR = _compile_validator(L2_SCHEMA)
+L3_VALIDATOR = _compile_validator(L3_SCHEMA)
+
+PREPARE_CACHE_SIZE = 16
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 20.0
+RETRY_JITTER_SECONDS = 0.5
+NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404, 413, 422})
+BOILERPLATE_MIN_PAGES = 3
+BOILERPLATE_EDGE_LINES = 3
+BOILERPLATE_PAGE_RATIO = 0.6
+PDF_EXTRACT_WORKERS = min(os.cpu_count() or 1, 8)
+# In-process MuPDF extraction runs at ~3ms/page; a spawned pool costs 0.5-2s to start, so only
+# documents far longer than the 28-68 page policy wordings can amortise it.
+PDF_PARALLEL_MIN_PAGES = 400
+_WHITESPACE_RUN = re.compile(r"\s+")
+_PAGE_NUMBER_LINE = re.compile(r"^\s*(?:page\s*)?(\d+)(?:\s*(?:of|/)\s*\d+)?\s*$", re.I)
+_BLANK_LINE_RUN = re.compile(r"\n[ \t]*(?:\n[ \t]*)+")
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
+_FIRST_BRACKET = re.compile(r"[\[\{]")
+_JSON_DECODER = json.JSONDecoder()
+
+_extract_pool: ProcessPoolExecutor | None = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            # Spawned workers avoid inheriting MuPDF and thread state from a forked server process.
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extract_pool
+
+
+def shutdown_extract_pool() -> None:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is not None:
+            _extract_pool.shutdown(wait=False, cancel_futures=True)
+            _extract_pool = None
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    # Runs in a worker process, so each call opens its own document handle.
+    with pymupdf.open(pdf_path) as document:
+        return [
+            (index + 1, document.load_page(index).get_text("text") or "")
+            for index in range(start, stop)
+        ]
+
+
+def _file_digest(path: str) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _write_cache_file(path: Path, payload: Any) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(orjson.dumps(payload))
+        os.replace(temp_path, path)
+    except OSError as exc:
+        logger.warning("policy_taxonomy.cache_write_failed", path=str(path), error=str(exc))
+
+
+def _printed_page_shift(line: str, page_number: int) -> int | None:
+    match = _PAGE_NUMBER_LINE.match(line)
+    return int(match.group(1)) - page_number if match else None
+
+
+def _page_number_edges(split_pages: List[Tuple[int, List[str]]], min_lines: int) -> set[Tuple[int, int]]:
+    """Return ``(edge offset, printed - physical page)`` pairs that follow the page sequence."""
+
+    counts: Counter[Tuple[int, int]] = Counter()
+    pages_seen = 0
+    for number, lines in split_pages:
+        if len(lines) < min_lines:
+            continue
+        pages_seen += 1
+        for offset in range(BOILERPLATE_EDGE_LINES):
+            for edge in (offset, -1 - offset):
+                shift = _printed_page_shift(lines[edge], number)
+                if shift is not None:
+                    counts[(edge, shift)] += 1
+    threshold = max(2, BOILERPLATE_PAGE_RATIO * pages_seen)
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _strip_boilerplate(pages: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Drop running headers/footers repeated across most pages and collapse blank-line runs.
+
+    A line only counts as boilerplate when the same text sits at the same offset from the top
+    or bottom edge on most pages; pages too short to have a body between their edges are left
+    untouched so a heading or table row is never mistaken for a header. A bare number at an
+    edge is only dropped when it climbs with the page number on several pages.
+    """
+
+    split_pages = [(number, (text or "").splitlines()) for number, text in pages]
+    min_lines = 2 * BOILERPLATE_EDGE_LINES + 1
+    eligible = [lines for _, lines in split_pages if len(lines) >= min_lines]
+    repeated: set[Tuple[int, str]] = set()
+    if len(eligible) >= BOILERPLATE_MIN_PAGES:
+        counts: Counter[Tuple[int, str]] = Counter()
+        for lines in eligible:
+            for offset in range(BOILERPLATE_EDGE_LINES):
+                for key in ((offset, lines[offset].strip()), (-1 - offset, lines[-1 - offset].strip())):
+                    if key[1]:
+                        counts[key] += 1
+        threshold = BOILERPLATE_PAGE_RATIO * len(eligible)
+        repeated = {key for key, count in counts.items() if count >= threshold}
+    numbered = _page_number_edges(split_pages, min_lines)
+
+    cleaned: List[Tuple[int, str]] = []
+    for number, lines in split_pages:
+        if len(lines) >= min_lines:
+            last = len(lines) - 1
+            kept = []
+            for index, line in enumerate(lines):
+                offset = index if index < BOILERPLATE_EDGE_LINES else index - last - 1
+                if -BOILERPLATE_EDGE_LINES <= offset < BOILERPLATE_EDGE_LINES and (
+                    (offset, line.strip()) in repeated
+                    or (offset, _printed_page_shift(line, number)) in numbered
+                ):
+                    continue
+                kept.append(line)
+            lines = kept
+        text = _BLANK_LINE_RUN.sub("\n\n", "\n".join(lines))
+        cleaned.append((number, text))
+    return cleaned
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    if isinstance(exc, APIStatusError):
+        retry_after = exc.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY_SECONDS)
+            except ValueError:
+                pass
+    # Jitter keeps concurrent layer calls from retrying in lockstep.
+    backoff = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt)
+    return backoff + random.uniform(0, RETRY_JITTER_SECONDS)
+
+
+def _validate_layer(validator: Any, raw: Any, label: str) -> None:
+    # Stop at the first violation instead of collecting every error like validate() does.
+    error = next(validator.iter_errors(raw), None)
+    if error is not None:
+        raise ValueError(f"{label} invalid: {error.message}")
+
+
 def _parse_strict_json(text: str) -> Any:
     content = (text or "").strip()
     if content.startswith("```"):
-        content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content, flags=re.S)
-    match = re.search(r"[\[\{]", content)
+        content = _CODE_FENCE.sub("", content)
+    match = _FIRST_BRACKET.search(content)
     if match:
         content = content[match.start() :]
     try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        lines = content.splitlines()
-        for cut in range(len(lines), 0, -1):
-            try:
-                return json.loads("\n".join(lines[:cut]))
-            except json.JSONDecodeError:
-                continue
-        raise
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        pass
+    # raw_decode stops at the end of the first complete value, ignoring any trailing text.
+    value, _ = _JSON_DECODER.raw_decode(content)
+    return value
+
+
+class _TruncatedCompletion(ValueError):
+    """The model hit max_tokens; re-asking the same prompt would truncate again."""
+
+
+class _JsonEndScanner:
+    """Track bracket depth across streamed deltas to spot the end of the top-level JSON value."""
+
+    __slots__ = ("depth", "in_string", "escaped", "started", "disabled", "prefix")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.disabled = False
+        self.prefix: List[str] = []
+
+    def feed(self, piece: str) -> bool:
+        if self.disabled:
+            return False
+        for char in piece:
+            if not self.started:
+                if char in "[{":
+                    # Only trust a value that opens the reply (optionally after a code fence).
+                    if "".join(self.prefix).strip().strip("`").strip().lower() not in ("", "json"):
+                        self.disabled = True
+                        return False
+                    self.started = True
+                    self.depth = 1
+                else:
+                    self.prefix.append(char)
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif char in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
 
 
 class PolicyIngestor:
@@ -147,8 +476,88 @@ class PolicyIngestor:
         if not self.cfg.groq_api_key:
             raise RuntimeError("GROQ_API_KEY not set")
         self.client = client or Groq(api_key=self.cfg.groq_api_key)
+        self._prepare_cache: OrderedDict[Tuple[Any, ...], Future[str]] = OrderedDict()
+        self._prepare_lock = threading.Lock()
 
     def _load_pages(self, pdf_path: str) -> List[Tuple[int, str]]:
+        if not self.cfg.page_cache_dir:
+            return self._extract_pages(pdf_path)
+        digest = _file_digest(pdf_path)
+        cache_path = Path(self.cfg.page_cache_dir) / f"{digest}.{self.cfg.pdf_backend}.json"
+        try:
+            return [(number, text) for number, text in orjson.loads(cache_path.read_bytes())]
+        except FileNotFoundError:
+            pass
+        except (OSError, orjson.JSONDecodeError, TypeError, ValueError) as exc:
+            logger.warning("policy_taxonomy.page_cache_read_failed", path=str(cache_path), error=str(exc))
+        pages = self._extract_pages(pdf_path)
+        _write_cache_file(cache_path, pages)
+        return pages
+
+    def _extract_pages(self, pdf_path: str) -> List[Tuple[int, str]]:
+        backend = self.cfg.pdf_backend
+        if backend == "pypdfium2" and pdfium is None:
+            logger.warning("policy_taxonomy.pypdfium2_unavailable")
+            backend = "pymupdf"
+        loader = {
+            "pymupdf": self._load_pages_pymupdf,
+            "pypdfium2": self._load_pages_pypdfium2,
+        }.get(backend)
+        if loader is not None:
+            try:
+                return loader(pdf_path)
+            except (RuntimeError, ValueError) as exc:
+                logger.warning(
+                    "policy_taxonomy.pdf_backend_failed",
+                    backend=backend,
+                    path=pdf_path,
+                    error=str(exc),
+                )
+        return self._load_pages_pdfplumber(pdf_path)
+
+    @staticmethod
+    def _load_pages_pypdfium2(pdf_path: str) -> List[Tuple[int, str]]:
+        # PDFium is not thread-safe, so pages are read sequentially on the calling thread.
+        document = pdfium.PdfDocument(pdf_path)
+        try:
+            pages: List[Tuple[int, str]] = []
+            for index in range(len(document)):
+                page = document[index]
+                textpage = page.get_textpage()
+                try:
+                    pages.append((index + 1, textpage.get_text_bounded() or ""))
+                finally:
+                    textpage.close()
+                    page.close()
+            return pages
+        finally:
+            document.close()
+
+    @staticmethod
+    def _load_pages_pymupdf(pdf_path: str) -> List[Tuple[int, str]]:
+        with pymupdf.open(pdf_path) as document:
+            if document.needs_pass:
+                raise ValueError("PDF is encrypted")
+            page_count = document.page_count
+            if page_count < PDF_PARALLEL_MIN_PAGES or PDF_EXTRACT_WORKERS < 2:
+                return [
+                    (index + 1, document.load_page(index).get_text("text") or "")
+                    for index in range(page_count)
+                ]
+
+        step = -(-page_count // PDF_EXTRACT_WORKERS)
+        pool = _get_extract_pool()
+        futures = [
+            pool.submit(_extract_page_range, pdf_path, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        pages: List[Tuple[int, str]] = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    @staticmethod
+    def _load_pages_pdfplumber(pdf_path: str) -> List[Tuple[int, str]]:
         pages: List[Tuple[int, str]] = []
         with pdfplumber.open(pdf_path) as pdf:
             for index, page in enumerate(pdf.pages, start=1):
@@ -157,85 +566,196 @@ class PolicyIngestor:
 
     def _chunk(self, pages: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
         chunks: List[Dict[str, Any]] = []
-        buffer = ""
+        parts: List[str] = []
+        length = 0
         start_page: int | None = None
         end_page: int | None = None
+
+        def flush() -> None:
+            text = "\n\n".join(parts)
+            if text:
+                pages_span = (start_page, end_page or start_page)
+                chunks.append(
+                    {
+                        "pages": pages_span,
+                        "text": text,
+                        "rendered": f"[PAGES {pages_span[0]}-{pages_span[1]}]\n{text}",
+                    }
+                )
+
         for page_number, text in pages:
             clean = (text or "").strip()
             if not clean:
                 continue
-            if start_page is None:
-                start_page = page_number
-            if len(buffer) + len(clean) + 16 <= self.cfg.max_chars:
-                buffer += f"\n\n[PAGE {page_number}]\n{clean}"
-                end_page = page_number
-            else:
-                if buffer.strip():
-                    chunks.append(
-                        {
-                            "pages": (start_page, end_page or start_page),
-                            "text": buffer.strip(),
-                        }
-                    )
-                buffer = f"[PAGE {page_number}]\n{clean}"
+            if parts and length + len(clean) + 2 > self.cfg.max_chars:
+                flush()
+                parts.clear()
+                length = 0
+            if not parts:
                 start_page = page_number
-                end_page = page_number
-        if buffer.strip():
-            chunks.append({"pages": (start_page, end_page or start_page), "text": buffer.strip()})
+            parts.append(clean)
+            length += len(clean) + 2
+            end_page = page_number
+        flush()
         return chunks
 
-    def _ask_json(self, system_prompt: str, user_prompt: str) -> Any:
+    @staticmethod
+    def _render_chunks(chunks: List[Dict[str, Any]]) -> str:
+        return "\n\n".join(chunk["rendered"] for chunk in chunks)
+
+    def _prepare(self, pdf_path: str) -> str:
+        """Return the rendered policy text block shared by every layer prompt."""
+
+        stat = os.stat(pdf_path)
+        key = (
+            os.path.abspath(pdf_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            self.cfg.max_chars,
+            self.cfg.take_chunks,
+        )
+        # The lock only guards the cache; the first caller for a key parses and duplicates wait on its future.
+        with self._prepare_lock:
+            pending = self._prepare_cache.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._prepare_cache[key] = Future()
+                if len(self._prepare_cache) > PREPARE_CACHE_SIZE:
+                    self._prepare_cache.popitem(last=False)
+            else:
+                self._prepare_cache.move_to_end(key)
+        if not owner:
+            return pending.result()
+
+        try:
+            pages = _strip_boilerplate(self._load_pages(pdf_path))
+            chunks = self._chunk(pages)[: self.cfg.take_chunks]
+            text = self._render_chunks(chunks)
+        except BaseException as exc:
+            with self._prepare_lock:
+                if self._prepare_cache.get(key) is pending:
+                    del self._prepare_cache[key]
+            pending.set_exception(exc)
+            raise
+        pending.set_result(text)
+        return text
+
+    def _complete_json_object(self, system_prompt: str, user_prompt: str, max_tokens: int | None) -> str:
+        # Groq's JSON mode guarantees a bare object but cannot be combined with streaming.
+        response = self.client.chat.completions.create(
+            model=self.cfg.groq_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=self.cfg.temperature,
+            max_tokens=max_tokens or self.cfg.max_tokens,
+            response_format={"type": "json_object"},
+        )
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            raise _TruncatedCompletion("JSON-mode reply truncated at max_tokens")
+        message = choice.message
+        return message.content if message and message.content else ""
+
+    def _stream_completion(self, system_prompt: str, user_prompt: str, max_tokens: int | None) -> str:
+        stream = self.client.chat.completions.create(
+            model=self.cfg.groq_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=self.cfg.temperature,
+            max_tokens=max_tokens or self.cfg.max_tokens,
+            stream=True,
+        )
+        parts: List[str] = []
+        scanner = _JsonEndScanner()
+        with stream:
+            for event in stream:
+                if not event.choices:
+                    continue
+                piece = event.choices[0].delta.content
+                if not piece:
+                    continue
+                parts.append(piece)
+                if scanner.feed(piece):
+                    # The JSON value is closed; stop paying for any trailing tokens.
+                    break
+        return "".join(parts)
+
+    def _response_cache_path(
+        self, system_prompt: str, user_prompt: str, max_tokens: int | None
+    ) -> Path | None:
+        if not (self.cfg.cache_enabled and self.cfg.cache_dir):
+            return None
+        hasher = hashlib.blake2b(digest_size=20)
+        for part in (
+            self.cfg.groq_model,
+            str(self.cfg.temperature),
+            str(max_tokens or self.cfg.max_tokens),
+            system_prompt,
+            _WHITESPACE_RUN.sub(" ", user_prompt),
+        ):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return Path(self.cfg.cache_dir) / f"{hasher.hexdigest()}.json"
+
+    def _remember_response(
+        self, system_prompt: str, user_prompt: str, max_tokens: int | None, raw: Any
+    ) -> None:
+        """Persist a validated response so identical prompts skip the Groq call next time."""
+
+        path = self._response_cache_path(system_prompt, user_prompt, max_tokens)
+        if path is None or path.exists():
+            return
+        _write_cache_file(path, raw)
+
+    def _ask_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int | None = None,
+        json_object: bool = False,
+    ) -> Any:
+        cache_path = self._response_cache_path(system_prompt, user_prompt, max_tokens)
+        if cache_path is not None:
+            try:
+                return orjson.loads(cache_path.read_bytes())
+            except FileNotFoundError:
+                pass
+            except (OSError, orjson.JSONDecodeError) as exc:
+                logger.warning("policy_taxonomy.cache_read_failed", path=str(cache_path), error=str(exc))
         error: Exception | None = None
         for attempt in range(self.cfg.retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.cfg.groq_model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=self.cfg.temperature,
-                    max_tokens=self.cfg.max_tokens,
-                )
-                message = response.choices[0].message
-                return _parse_strict_json(message.content if message and message.content else "")
+                if json_object:
+                    content = self._complete_json_object(system_prompt, user_prompt, max_tokens)
+                else:
+                    content = self._stream_completion(system_prompt, user_prompt, max_tokens)
+                return _parse_strict_json(content)
             except Exception as exc:  # pragma: no cover - defensive against API errors
                 error = exc
+                # JSON mode rejects a truncated reply with a 400 (json_validate_failed) rather than
+                # returning a prefix; neither that nor a length stop improves on retry.
+                if isinstance(exc, _TruncatedCompletion) or (
+                    isinstance(exc, APIStatusError) and exc.status_code in NON_RETRYABLE_STATUS
+                ):
+                    break
+                if attempt + 1 >= self.cfg.retries:
+                    break
+                delay = _retry_delay(exc, attempt)
                 logger.warning(
                     "policy_taxonomy.llm_retry",
                     attempt=attempt + 1,
                     retries=self.cfg.retries,
+                    delay=round(delay, 2),
                     error=str(exc),
                 )
-                time.sleep(1.2 * (attempt + 1))
+                time.sleep(delay)
         raise RuntimeError(f"Groq call failed: {error}")
 
-    def _sys_l1(self) -> str:
-        return (
-            "Extract Layer 1: General Conditions from travel-insurance policy text.\n"
-            "Return STRICT JSON ONLY (no prose or code fences).\n"
-            "Each item MUST have:\n"
-            '{\n'
-            '  "condition": "<snake_case_name>",\n'
-            '  "condition_type": "eligibility" | "exclusion",\n'
-            '  "products": {\n'
-            '    "<product_label>": {\n'
-            '      "condition_exist": true/false,\n'
-            '      "original_text": "exact policy wording",\n'
-            '      "parameters": {\n'
-            '        // key-value pairs capturing explicit criteria or thresholds found in the text\n'
-            '        // e.g., {"age_limit": "12 years", "requires_parent_guardian": true, "territory": "worldwide"}\n'
-            '      }\n'
-            '    }\n'
-            '  }\n'
-            '}\n'
-            "Do not leave 'parameters' empty unless no measurable or categorical detail exists. "
-            "Infer structured keys such as age, duration, distance, monetary thresholds, frequency, or role requirements."
-            "Your output MUST conform exactly to the JSON shape described ? do not change field names or omit fields. "
-            "Only vary the contents of the 'parameters' object as key-value pairs."
-        )
-
-    def _user_l1(self, product_label: str, chunks: List[Dict[str, Any]]) -> str:
+    def _user_l1(self, product_label: str, text: str) -> str:
         shape = (
             '[{"condition":"<snake_case_key>",'  # noqa: E501
             '"condition_type":"eligibility|exclusion",'  # noqa: E501
@@ -247,9 +767,6 @@ class PolicyIngestor:
             '"parameters":{"<parameter_key>":"<parameter_value>", "...":"..."}'  # noqa: E501
             '}}}]'
         )
-        text = "\n\n".join(
-            [f"[PAGES {start}-{end}]\n{chunk['text']}" for (start, end), chunk in [(item["pages"], item) for item in chunks]]
-        )
         return (
             f"product_label: {product_label}\n"
             f"Return an array in EXACT shape:\n{shape}\n\n"
@@ -257,33 +774,7 @@ class PolicyIngestor:
             f"{text}"
         )
 
-    def _sys_l2(self) -> str:
-        return (
-            "Extract Layer 2: ALL coverage benefits and their limits/qualifiers from the policy text.\n"
-            "Return STRICT JSON ONLY (no prose, no code fences).\n"
-            "Each array item MUST be exactly:\n"
-            '{\n'
-            '  "benefit_name": "<snake_case_identifier>",\n'
-            '  "parameters": [],\n'
-            '  "products": { "<product_label>": {\n'
-            '      "condition_exist": true/false,\n'
-            '      "parameters": {\n'
-            '        "coverage_limit": "<amount or descriptor if present>",\n'
-            '        "sub_limits": { /* zero or more key-value pairs that appear in the text */ }\n'
-            '      }\n'
-            '  }}\n'
-            '}\n'
-            "Rules:\n"
-            "- Discover EVERY benefit section present (e.g., medical expenses, trip cancellation, delay, baggage, personal liability,\n"
-            "  evacuation, adventurous activities, rental vehicle excess, etc.).\n"
-            "- Use short, machine-friendly snake_case for benefit_name (e.g., trip_cancellation, delayed_baggage, personal_liability).\n"
-            "- If a coverage cap exists, put it in coverage_limit (keep units/format from text); if none is stated, omit that field or set a descriptive value.\n"
-            "- Put any nested caps/thresholds/waiting_periods/deductibles/percentages into sub_limits as key-value pairs (only if present in the text).\n"
-            "- Do NOT invent keys. Use exact facts. If a field isn?t present in the text, leave it out.\n"
-            "- Your output MUST conform exactly to the JSON shape above: only vary the contents of the 'parameters' object."
-        )
-
-    def _user_l2(self, product_label: str, chunks: List[Dict[str, Any]]) -> str:
+    def _user_l2(self, product_label: str, text: str) -> str:
         shape = (
             '[{"benefit_name":"<snake_case_identifier>",'  # noqa: E501
             '"parameters":[],'
@@ -295,9 +786,6 @@ class PolicyIngestor:
             '"sub_limits":{"<key>":"<value>"}}'  # noqa: E501
             '}}}]'
         )
-        text = "\n\n".join(
-            [f"[PAGES {start}-{end}]\n{chunk['text']}" for (start, end), chunk in [(item["pages"], item) for item in chunks]]
-        )
         return (
             f"product_label: {product_label}\n"
             f"Return array in EXACT shape:\n{shape}\n\n"
@@ -305,33 +793,7 @@ class PolicyIngestor:
             f"{text}"
         )
 
-    def _sys_l3(self) -> str:
-        return (
-            "Extract Layer 3: Benefit-specific conditions (eligibilities/exclusions) tied to EACH benefit.\n"
-            "Return STRICT JSON ONLY (no prose, no code fences).\n"
-            "Each array item MUST be exactly:\n"
-            '{\n'
-            '  "benefit_name": "<parent_benefit_snake_case>",\n'
-            '  "condition": "<specific_condition_snake_case>",\n'
-            '  "condition_type": "benefit_eligibility" | "benefit_exclusion",\n'
-            '  "parameters": [],\n'
-            '  "products": { "<product_label>": {\n'
-            '      "condition_exist": true/false,\n'
-            '      "original_text": "minimal exact quote from the policy",\n'
-            '      "parameters": { /* zero or more key-value pairs present in the text */ }\n'
-            '  }}\n'
-            '}\n'
-            "Rules:\n"
-            "- For EACH benefit discovered in Layer 2, find its explicit conditions (e.g., time limits, documentation requirements,\n"
-            "  minimum thresholds, known-circumstance exclusions, activity/location qualifiers, age rules, waiting periods, deductibles, etc.).\n"
-            "- Use short snake_case names for both benefit_name and condition, reflecting the policy?s wording.\n"
-            "- In 'products.<product_label>.parameters', include ONLY measurable/categorical keys that appear in the text\n"
-            "  (e.g., {\"time_limit\":\"90 days\", \"minimum_amount\":\"$500\", \"requires_doctor_note\":true}).\n"
-            "- Do NOT invent keys. Only include parameters present in the text. Preserve units/format.\n"
-            "- Your output MUST conform exactly to the JSON shape above; only vary the contents of the 'parameters' object."
-        )
-
-    def _user_l3(self, product_label: str, chunks: List[Dict[str, Any]]) -> str:
+    def _user_l3(self, product_label: str, text: str) -> str:
         shape = (
             '[{"benefit_name":"<parent_benefit>",'  # noqa: E501
             '"condition":"<specific_condition>",'  # noqa: E501
@@ -345,9 +807,6 @@ class PolicyIngestor:
             '"parameters":{"<parameter_key>":"<parameter_value>"}'  # noqa: E501
             '}}}]'
         )
-        text = "\n\n".join(
-            [f"[PAGES {start}-{end}]\n{chunk['text']}" for (start, end), chunk in [(item["pages"], item) for item in chunks]]
-        )
         return (
             f"product_label: {product_label}\n"
             f"Return array in EXACT shape:\n{shape}\n\n"
@@ -356,35 +815,73 @@ class PolicyIngestor:
         )
 
     def run_layer1(self, pdf_path: str, product_label: str) -> Dict[str, Any]:
-        pages = self._load_pages(pdf_path)
-        chunks = self._chunk(pages)[: self.cfg.take_chunks]
-        raw = self._ask_json(self._sys_l1(), self._user_l1(product_label, chunks))
-        try:
-            Draft7Validator(L1_SCHEMA).validate(raw)
-        except ValidationError as exc:
-            raise ValueError(f"L1 invalid: {exc.message}") from exc
+        text = self._prepare(pdf_path)
+        user_prompt = self._user_l1(product_label, text)
+        raw = self._ask_json(SYS_L1, user_prompt)
+        _validate_layer(L1_VALIDATOR, raw, "L1")
+        self._remember_response(SYS_L1, user_prompt, None, raw)
         return {"layer_1": raw}
 
     def run_layer2(self, pdf_path: str, product_label: str) -> Dict[str, Any]:
-        pages = self._load_pages(pdf_path)
-        chunks = self._chunk(pages)[: self.cfg.take_chunks]
-        raw = self._ask_json(self._sys_l2(), self._user_l2(product_label, chunks))
-        try:
-            Draft7Validator(L2_SCHEMA).validate(raw)
-        except ValidationError as exc:
-            raise ValueError(f"L2 invalid: {exc.message}") from exc
+        text = self._prepare(pdf_path)
+        user_prompt = self._user_l2(product_label, text)
+        raw = self._ask_json(SYS_L2, user_prompt)
+        _validate_layer(L2_VALIDATOR, raw, "L2")
+        self._remember_response(SYS_L2, user_prompt, None, raw)
         return {"layer_2": raw}
 
     def run_layer3(self, pdf_path: str, product_label: str) -> Dict[str, Any]:
-        pages = self._load_pages(pdf_path)
-        chunks = self._chunk(pages)[: self.cfg.take_chunks]
-        raw = self._ask_json(self._sys_l3(), self._user_l3(product_label, chunks))
-        try:
-            Draft7Validator(L3_SCHEMA).validate(raw)
-        except ValidationError as exc:
-            raise ValueError(f"L3 invalid: {exc.message}") from exc
+        text = self._prepare(pdf_path)
+        user_prompt = self._user_l3(product_label, text)
+        raw = self._ask_json(SYS_L3, user_prompt)
+        _validate_layer(L3_VALIDATOR, raw, "L3")
+        self._remember_response(SYS_L3, user_prompt, None, raw)
         return {"layer_3": raw}
 
+    def _user_all(self, product_label: str, text: str) -> str:
+        products = '"products":{"' + product_label + '":{'
+        shape = (
+            '{"layer_1":[{"condition":"<snake_case_key>","condition_type":"eligibility|exclusion",'
+            + products
+            + '"condition_exist":true,"original_text":"...","parameters":{"<parameter_key>":"<parameter_value>"}}}}],'
+            '"layer_2":[{"benefit_name":"<snake_case_identifier>","parameters":[],'
+            + products
+            + '"condition_exist":true,"parameters":{"coverage_limit":"<value_or_descriptor_if_present>",'
+            '"sub_limits":{"<key>":"<value>"}}}}}],'
+            '"layer_3":[{"benefit_name":"<parent_benefit>","condition":"<specific_condition>",'
+            '"condition_type":"benefit_eligibility|benefit_exclusion","parameters":[],'
+            + products
+            + '"condition_exist":true,"original_text":"...","parameters":{"<parameter_key>":"<parameter_value>"}}}}]}'
+        )
+        return (
+            f"product_label: {product_label}\n"
+            f"Return an object in EXACT shape:\n{shape}\n\n"
+            "Policy text:\n-----\n"
+            f"{text}"
+        )
+
+    def run_all_layers(self, pdf_path: str, product_label: str) -> Dict[str, Any]:
+        """Extract every layer with a single Groq call over one shared copy of the policy text."""
+
+        text = self._prepare(pdf_path)
+        user_prompt = self._user_all(product_label, text)
+        # Never give the fused reply less room than the three per-layer replies it replaces.
+        max_tokens = max(self.cfg.fused_max_tokens, 3 * self.cfg.max_tokens)
+        raw = self._ask_json(SYS_ALL, user_prompt, max_tokens=max_tokens, json_object=True)
+        if not isinstance(raw, dict):
+            raise ValueError("Fused extraction invalid: expected a JSON object")
+        result: Dict[str, Any] = {}
+        for key, validator, label in (
+            ("layer_1", L1_VALIDATOR, "L1"),
+            ("layer_2", L2_VALIDATOR, "L2"),
+            ("layer_3", L3_VALIDATOR, "L3"),
+        ):
+            layer = raw.get(key)
+            _validate_layer(validator, layer, label)
+            result[key] = layer
+        self._remember_response(SYS_ALL, user_prompt, max_tokens, raw)
+        return result
+
 
 def extract_all_layers(
     pdf_path: str,
@@ -394,9 +891,26 @@ def extract_all_layers(
     if not product_label or not product_label.strip():
         raise ValueError("product_label cannot be empty")
     ing = ingestor or PolicyIngestor()
-    layer1 = ing.run_layer1(pdf_path, product_label)["layer_1"]
-    layer2 = ing.run_layer2(pdf_path, product_label)["layer_2"]
-    layer3 = ing.run_layer3(pdf_path, product_label)["layer_3"]
+    if isinstance(ing, PolicyIngestor) and ing.cfg.fuse_layers:
+        try:
+            fused = ing.run_all_layers(pdf_path, product_label)
+        except (RuntimeError, ValueError) as exc:
+            # Truncated or rejected JSON-mode replies surface as RuntimeError from _ask_json.
+            logger.warning("policy_taxonomy.fused_extraction_failed", error=str(exc))
+        else:
+            return {
+                "layer_1_general_conditions": fused["layer_1"],
+                "layer_2_benefits": fused["layer_2"],
+                "layer_3_benefit_conditions": fused["layer_3"],
+            }
+    # The layer calls are independent network round-trips, so overlap them.
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="policy-layer") as pool:
+        future1 = pool.submit(ing.run_layer1, pdf_path, product_label)
+        future2 = pool.submit(ing.run_layer2, pdf_path, product_label)
+        future3 = pool.submit(ing.run_layer3, pdf_path, product_label)
+        layer1 = future1.result()["layer_1"]
+        layer2 = future2.result()["layer_2"]
+        layer3 = future3.result()["layer_3"]
     return {
         "layer_1_general_conditions": layer1,
         "layer_2_benefits": layer2,
@@ -408,6 +922,7 @@ __all__ = [
     "IngestCfg",
     "PolicyIngestor",
     "extract_all_layers",
+    "shutdown_extract_pool",
     "L1_SCHEMA",
     "L2_SCHEMA",
     "L3_SCHEMA",
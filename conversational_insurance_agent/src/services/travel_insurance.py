@@ -2,21 +2,147 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Optional, Tuple
 
+import asyncio
 import re
+import time
 from datetime import date, datetime
+from functools import lru_cache
 
 import httpx
+import orjson
+from tenacity import (
+    retry,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 from ..config import Settings, get_settings
 from ..utils.logging import logger
 
 
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+def _is_transient_ancileo_error(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout)):
+        return True
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and exc.response.status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+# Travel and birth dates repeat across a session's quote and purchase calls.
+DATE_CACHE_SIZE = 1024
+
+_ISO_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_COUNTRY_CODE = re.compile(r"[A-Z0-9]{2}")
+_DEVICE_SEPARATORS = re.compile(r"[\s_-]+")
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+_NUMERIC_DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%d-%m-%Y",
+)
+_TEXTUAL_DATE_FORMATS = (
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+)
+
+_INSURED_FIELDS: Tuple[str, ...] = (
+    "id",
+    "title",
+    "firstName",
+    "lastName",
+    "nationality",
+    "dateOfBirth",
+    "passport",
+    "email",
+    "phoneType",
+    "phoneNumber",
+    "relationship",
+)
+_MAIN_CONTACT_FIELDS: Tuple[str, ...] = ("address", "city", "zipCode", "countryCode")
+
+_PAYLOAD_LOG_FIELDS: Tuple[str, ...] = ("market", "languageCode", "channel", "deviceType", "quoteId")
+_CONTEXT_LOG_FIELDS: Tuple[str, ...] = (
+    "tripType",
+    "departureDate",
+    "returnDate",
+    "departureCountry",
+    "arrivalCountry",
+    "adultsCount",
+    "childrenCount",
+)
+
+_TRIP_TYPES: Dict[str, str] = {
+    **dict.fromkeys(("st", "single", "single_trip", "one_way", "one-way"), "ST"),
+    **dict.fromkeys(("rt", "round", "round_trip", "roundtrip", "return"), "RT"),
+}
+# Keyed by the upper-cased value with spaces, underscores and hyphens removed.
+_DEVICE_TYPES: Dict[str, str] = {
+    "DESKTOP": "DESKTOP",
+    "MOBILE": "MOBILE",
+    "TABLET": "TABLET",
+    "OTHER": "OTHER",
+    "SMARTPHONE": "MOBILE",
+    "PHONE": "MOBILE",
+    "CELL": "MOBILE",
+    "LAPTOP": "DESKTOP",
+    "PC": "DESKTOP",
+    "TABLETPC": "TABLET",
+}
+
+# The stakeholder-fixed quotation request never changes, so it is built and serialised once.
+_HARDCODED_QUOTE_PAYLOAD: Dict[str, Any] = {
+    "market": "SG",
+    "languageCode": "en",
+    "channel": "white-label",
+    "deviceType": "DESKTOP",
+    "context": {
+        "tripType": "ST",
+        "departureDate": "2025-11-01",
+        "returnDate": "2025-11-15",
+        "departureCountry": "SG",
+        "arrivalCountry": "CN",
+        "adultsCount": 1,
+        "childrenCount": 0,
+    },
+}
+_HARDCODED_QUOTE_BODY = orjson.dumps(_HARDCODED_QUOTE_PAYLOAD)
+
+
 class AncileoAPIError(RuntimeError):
     """Raised when the Ancileo platform returns an error response."""
 
 
+class _LazyPayloadSummary:
+    """Defer building a request summary until structlog renders the event."""
+
+    __slots__ = ("_payload",)
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self._payload = payload
+
+    def __structlog__(self) -> Dict[str, Any]:
+        return AncileoTravelAPI._summarize_payload(self._payload)
+
+    def __repr__(self) -> str:
+        return repr(self.__structlog__())
+
+
 class AncileoTravelAPI:
     """Wrapper around Ancileo's travel insurance APIs used in the hackathon."""
 
@@ -26,17 +152,35 @@ class AncileoTravelAPI:
         if not self._base_url:
             raise ValueError("ANCILEO_BASE_URL is not configured")
         self._timeout = 15.0
+        # One pooled client per wrapper so quote and purchase calls reuse keep-alive connections;
+        # HTTP/2 multiplexes them over one connection when the gateway negotiates it via ALPN.
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=self._timeout,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self._quote_cache_ttl = float(self._settings.ancileo_quote_cache_ttl)
+        self._quote_cache: Dict[bytes, Tuple[float, bytes]] = {}
+        self._quote_cache_lock = asyncio.Lock()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
     async def quote(self, **payload: Any) -> Dict[str, Any]:
         """Call the Ancileo quotation endpoint and return the JSON payload.
 
         The integration currently requires a fixed payload provided by the
         stakeholder, so any payload supplied by the caller is ignored in favour
-        of that hard-coded request.
+        of that hard-coded request. Responses are cached per request body for
+        ``ancileo_quote_cache_ttl`` seconds; every call gets its own copy.
         """
 
         request = self._hardcoded_quote_payload()
-        data = await self._post("/pricing", request)
+        data = await self._cached_quote(request, _HARDCODED_QUOTE_BODY)
 
         quote_id = data.get("quoteId") if isinstance(data, dict) else None
         offers = data.get("offers") if isinstance(data, dict) else None
@@ -45,25 +189,32 @@ class AncileoTravelAPI:
 
         return data
 
+    async def _cached_quote(self, request: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        if self._quote_cache_ttl <= 0:
+            return await self._post("/pricing", request, body=body, idempotent=True)
+
+        # Holding the lock across the request collapses concurrent misses into one call.
+        async with self._quote_cache_lock:
+            cached = self._quote_cache.get(body)
+            now = time.monotonic()
+            if cached is not None and cached[0] > now:
+                logger.info("ancileo.quote.cache_hit")
+                # Cached as JSON bytes so each hit decodes a fresh dict callers may mutate.
+                return orjson.loads(cached[1])
+
+            data = await self._post("/pricing", request, body=body, idempotent=True)
+            if isinstance(data, dict):
+                self._quote_cache[body] = (now + self._quote_cache_ttl, orjson.dumps(data))
+            return data
+
     @staticmethod
     def _hardcoded_quote_payload() -> Dict[str, Any]:
-        """Return the fixed quotation payload expected by the Ancileo sandbox."""
-
-        return {
-            "market": "SG",
-            "languageCode": "en",
-            "channel": "white-label",
-            "deviceType": "DESKTOP",
-            "context": {
-                "tripType": "ST",
-                "departureDate": "2025-11-01",
-                "returnDate": "2025-11-15",
-                "departureCountry": "SG",
-                "arrivalCountry": "CN",
-                "adultsCount": 1,
-                "childrenCount": 0,
-            },
-        }
+        """Return the fixed quotation payload expected by the Ancileo sandbox.
+
+        The returned mapping is shared and must not be mutated.
+        """
+
+        return _HARDCODED_QUOTE_PAYLOAD
 
     async def purchase(self, **payload: Any) -> Dict[str, Any]:
         """Call the Ancileo purchase endpoint after successful payment."""
@@ -189,41 +340,24 @@ class AncileoTravelAPI:
         if not isinstance(insured, dict):
             raise ValueError("Each insured entry must be an object")
 
-        required_fields = [
-            "id",
-            "title",
-            "firstName",
-            "lastName",
-            "nationality",
-            "dateOfBirth",
-            "passport",
-            "email",
-            "phoneType",
-            "phoneNumber",
-            "relationship",
-        ]
-
-        normalized = {field: self._require_str(insured, field) for field in required_fields}
-
-        return normalized
+        return self._require_fields(insured, _INSURED_FIELDS)
 
     def _normalize_main_contact(self, contact: Dict[str, Any]) -> Dict[str, Any]:
         normalized = self._normalize_insured(contact)
-
-        extra_fields = {
-            "address": self._require_str(contact, "address"),
-            "city": self._require_str(contact, "city"),
-            "zipCode": self._require_str(contact, "zipCode"),
-            "countryCode": self._require_str(contact, "countryCode"),
-        }
-
-        normalized.update(extra_fields)
+        normalized.update(self._require_fields(contact, _MAIN_CONTACT_FIELDS))
         return normalized
 
     # ------------------------------------------------------------------
     # HTTP helpers
     # ------------------------------------------------------------------
-    async def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _post(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        *,
+        body: Optional[bytes] = None,
+        idempotent: bool = False,
+    ) -> Dict[str, Any]:
         self._ensure_api_key()
 
         url = f"{self._base_url}{endpoint}"
@@ -232,16 +366,18 @@ class AncileoTravelAPI:
             "x-api-key": self._settings.ancileo_api_key,
         }
 
-        logger.info(
-            "ancileo.request",
+        logger.info("ancileo.request", endpoint=endpoint)
+        # Under the default INFO filter this is a no-op, so the summary is never built.
+        logger.debug(
+            "ancileo.request.payload",
             endpoint=endpoint,
-            summary=self._summarize_payload(payload),
+            summary=_LazyPayloadSummary(payload),
         )
 
+        content = body if body is not None else orjson.dumps(payload)
+        send = self._send_idempotent if idempotent else self._send
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
+            response = await send(url, content, headers)
         except httpx.HTTPStatusError as exc:  # pragma: no cover - exercised via unit tests
             body = self._safe_text(exc.response)
             logger.error(
@@ -258,13 +394,38 @@ class AncileoTravelAPI:
             raise AncileoAPIError("Unable to reach Ancileo API") from exc
 
         try:
-            data = response.json()
-        except ValueError as exc:  # pragma: no cover - defensive
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError as exc:  # pragma: no cover - defensive
             logger.error("ancileo.invalid_json", endpoint=endpoint)
             raise AncileoAPIError("Ancileo API returned invalid JSON") from exc
 
         return data
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.1, max=1) + wait_random(0, 0.1),
+        retry=retry_if_exception(_is_transient_ancileo_error),
+        reraise=True,
+    )
+    async def _send_idempotent(
+        self, url: str, content: bytes, headers: Dict[str, str]
+    ) -> httpx.Response:
+        response = await self._http.post(url, content=content, headers=headers)
+        response.raise_for_status()
+        return response
+
+    # Purchases are not idempotent, so only retry when the request never left.
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.1, max=1) + wait_random(0, 0.1),
+        retry=retry_if_exception_type((httpx.ConnectError, httpx.ConnectTimeout)),
+        reraise=True,
+    )
+    async def _send(self, url: str, content: bytes, headers: Dict[str, str]) -> httpx.Response:
+        response = await self._http.post(url, content=content, headers=headers)
+        response.raise_for_status()
+        return response
+
     def _ensure_api_key(self) -> None:
         if not self._settings.ancileo_api_key:
             raise AncileoAPIError("ANCILEO_API_KEY is not configured")
@@ -284,22 +445,10 @@ class AncileoTravelAPI:
         if not raw:
             raw = self._settings.ancileo_default_device
 
-        cleaned = re.sub(r"[\s_-]+", " ", raw).strip().upper()
-        cleaned = cleaned.replace(" ", "")
-
-        aliases = {
-            "SMARTPHONE": "MOBILE",
-            "PHONE": "MOBILE",
-            "CELL": "MOBILE",
-            "LAPTOP": "DESKTOP",
-            "PC": "DESKTOP",
-            "TABLETPC": "TABLET",
-        }
-
-        normalized = aliases.get(cleaned, cleaned)
-
-        allowed = {"DESKTOP", "MOBILE", "TABLET", "OTHER"}
-        if normalized not in allowed:
+        normalized = _DEVICE_TYPES.get(raw.upper())
+        if normalized is None:
+            normalized = _DEVICE_TYPES.get(_DEVICE_SEPARATORS.sub("", raw).upper())
+        if normalized is None:
             raise ValueError("deviceType must be one of DESKTOP/MOBILE/TABLET/OTHER")
 
         return normalized
@@ -321,11 +470,16 @@ class AncileoTravelAPI:
             raise ValueError(f"Field '{field}' is required and cannot be empty")
 
         normalized = text.strip().upper()
-        if not re.fullmatch(r"[A-Z0-9]{2}", normalized):
+        if not _COUNTRY_CODE.fullmatch(normalized):
             raise ValueError(f"Field '{field}' must be a valid ISO country code")
 
         return normalized
 
+    @staticmethod
+    def _require_fields(payload: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, str]:
+        require = AncileoTravelAPI._require_str
+        return {field: require(payload, field) for field in fields}
+
     @staticmethod
     def _require_str(payload: Dict[str, Any], field: str) -> str:
         value = payload.get(field)
@@ -384,16 +538,10 @@ class AncileoTravelAPI:
     def _normalize_trip_type(value: Any) -> Optional[str]:
         if value is None:
             return None
-        text = str(value).strip().lower()
-        if not text:
-            return None
-        if text in {"st", "single", "single_trip", "one_way", "one-way"}:
-            return "ST"
-        if text in {"rt", "round", "round_trip", "roundtrip", "return"}:
-            return "RT"
-        return None
+        return _TRIP_TYPES.get(str(value).strip().lower())
 
     @staticmethod
+    @lru_cache(maxsize=DATE_CACHE_SIZE)
     def _coerce_date_string(value: str) -> Optional[str]:
         candidate = value.strip()
         if not candidate:
@@ -401,10 +549,17 @@ class AncileoTravelAPI:
 
         # Normalise common separators
         candidate = candidate.replace("/", "-").replace(".", "-")
-        candidate = re.sub(r"\s+", " ", candidate)
+        candidate = _WHITESPACE_RUN.sub(" ", candidate)
+
+        # Fast path for the common zero-padded YYYY-MM-DD shape
+        if len(candidate) == 10 and candidate[4] == "-" and candidate[7] == "-":
+            try:
+                return date.fromisoformat(candidate).isoformat()
+            except ValueError:
+                pass
 
         # Direct YYYY-MM-DD or YYYY-M-D
-        match = re.fullmatch(r"(\d{4})-(\d{1,2})-(\d{1,2})", candidate)
+        match = _ISO_DATE.fullmatch(candidate)
         if match:
             year, month, day = map(int, match.groups())
             try:
@@ -422,21 +577,9 @@ class AncileoTravelAPI:
         except ValueError:
             pass
 
-        # Additional relaxed formats
-        patterns = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M",
-            "%Y-%m-%d %H:%M:%S%z",
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%d-%m-%Y",
-            "%d/%m/%Y",
-            "%d %b %Y",
-            "%d %B %Y",
-            "%b %d %Y",
-            "%B %d %Y",
-        ]
+        # Additional relaxed formats; month names only parse with the textual ones
+        has_month_name = any(char.isalpha() and char != "T" for char in candidate)
+        patterns = _TEXTUAL_DATE_FORMATS if has_month_name else _NUMERIC_DATE_FORMATS
 
         for pattern in patterns:
             try:
@@ -457,32 +600,25 @@ class AncileoTravelAPI:
     @staticmethod
     def _summarize_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
         summary: Dict[str, Any] = {}
-        for key in ("market", "languageCode", "channel", "deviceType", "quoteId"):
+        for key in _PAYLOAD_LOG_FIELDS:
             if key in payload:
                 summary[key] = payload[key]
 
         context = payload.get("context")
         if isinstance(context, dict):
-            summary["context"] = {
-                key: context.get(key)
-                for key in (
-                    "tripType",
-                    "departureDate",
-                    "returnDate",
-                    "departureCountry",
-                    "arrivalCountry",
-                    "adultsCount",
-                    "childrenCount",
-                )
-            }
+            get = context.get
+            context_summary: Dict[str, Any] = {}
+            for key in _CONTEXT_LOG_FIELDS:
+                context_summary[key] = get(key)
+            summary["context"] = context_summary
 
         purchase_offers = payload.get("purchaseOffers")
-        if isinstance(purchase_offers, Iterable):
-            summary["purchaseOffers"] = len(list(purchase_offers))
+        if isinstance(purchase_offers, list):
+            summary["purchaseOffers"] = len(purchase_offers)
 
         insureds = payload.get("insureds")
-        if isinstance(insureds, Iterable):
-            summary["insureds"] = len(list(insureds))
+        if isinstance(insureds, list):
+            summary["insureds"] = len(insureds)
 
         return summary
 
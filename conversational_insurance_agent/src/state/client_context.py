@@ -182,6 +182,26 @@ def serialize_client(client: ClientDatum) -> Dict[str, Any]:
     return _to_jsonable(raw)
 
 
+def construct_client(payload: Dict[str, Any]) -> ClientDatum:
+    """Rebuild a client from trusted ``serialize_client`` output without re-validating it."""
+
+    data = dict(payload)
+    personal_info = dict(data.get("personal_info") or {})
+    _restore_date(personal_info, "dateOfBirth")
+    data["personal_info"] = PersonalInfo.model_construct(**personal_info)
+
+    trips: List[TripDetails] = []
+    for raw_trip in data.get("trips") or []:
+        trip = dict(raw_trip)
+        _restore_date(trip, "startDate")
+        _restore_date(trip, "endDate")
+        trips.append(TripDetails.model_construct(**trip))
+    data["trips"] = trips
+
+    data["verification"] = VerificationRecord.model_construct(**(data.get("verification") or {}))
+    return ClientDatum.model_construct(**data)
+
+
 def serialize_clients(clients: List[ClientDatum]) -> List[Dict[str, Any]]:
     serialized: List[Dict[str, Any]] = []
     for client in clients:
@@ -421,6 +441,12 @@ def _merge_verification(
     return current
 
 
+def _restore_date(data: Dict[str, Any], key: str) -> None:
+    value = data.get(key)
+    if isinstance(value, str):
+        data[key] = date.fromisoformat(value)
+
+
 def _to_jsonable(value: Any) -> Any:
     if isinstance(value, dict):
         return {key: _to_jsonable(val) for key, val in value.items()}
@@ -62,10 +62,39 @@ class ConversationSessionStore:
     def clear(self, session_id: str) -> None:
         self._redis.delete(self._key(session_id))
 
-    def merge_clients(self, session_id: str, clients: List[ClientDatum], source: Optional[str] = None) -> List[ClientDatum]:
+    def merge_clients(
+        self,
+        session_id: str,
+        clients: List[ClientDatum],
+        source: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> List[ClientDatum]:
         if not clients:
             return self.get_clients(session_id)
+        return self._merge_into(self.get(session_id), session_id, clients, source, fingerprint)
 
+    def merge_clients_if_changed(
+        self, session_id: str, clients: List[ClientDatum], source: Optional[str], fingerprint: str
+    ) -> bool:
+        """Merge ``clients`` unless this exact payload was already merged into the stored session.
+
+        The fingerprint lives in the session record itself, so it expires with the merged state.
+        """
+
+        session = self.get(session_id)
+        if session.get("client_fingerprints", {}).get(source or "") == fingerprint:
+            return False
+        self._merge_into(session, session_id, clients, source, fingerprint)
+        return True
+
+    def _merge_into(
+        self,
+        session: Dict[str, Any],
+        session_id: str,
+        clients: List[ClientDatum],
+        source: Optional[str],
+        fingerprint: Optional[str],
+    ) -> List[ClientDatum]:
         normalized: List[ClientDatum] = []
         for client in clients:
             if source and not client.source:
@@ -77,10 +106,11 @@ class ConversationSessionStore:
             else:
                 normalized.append(client)
 
-        session = self.get(session_id)
         existing_clients = deserialize_clients(session.get("clients", []))
         merged_clients = merge_client_records(existing_clients, normalized)
         session["clients"] = serialize_clients(merged_clients)
+        if fingerprint is not None:
+            session.setdefault("client_fingerprints", {})[source or ""] = fingerprint
         self._write(session_id, session)
         return merged_clients
 
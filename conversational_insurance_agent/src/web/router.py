@@ -9,6 +9,7 @@ from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
 from ..core.orchestrator import ConversationalOrchestrator
+from ..core.setup import ensure_orchestrator
 from ..utils.logging import logger
 from .mock_db import MockUserRecord, authenticate_user, get_user
 
@@ -59,13 +60,7 @@ def mount_integration_static(app) -> None:  # pragma: no cover - runtime wiring
 
 
 def get_portal_orchestrator(request: Request) -> ConversationalOrchestrator:
-    orchestrator = getattr(request.app.state, "orchestrator", None)
-    if orchestrator is None:
-        from ..core.setup import build_orchestrator
-
-        orchestrator = build_orchestrator()
-        request.app.state.orchestrator = orchestrator
-    return orchestrator
+    return ensure_orchestrator(request.app.state)
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -2,7 +2,13 @@ from datetime import date
 
 import unittest
 
-from src.state.client_context import ClientDatum, PersonalInfo, TripDetails
+from src.state.client_context import (
+    ClientDatum,
+    PersonalInfo,
+    TripDetails,
+    construct_client,
+    serialize_client,
+)
 
 
 class ClientDatumRequiredFieldsTest(unittest.TestCase):
@@ -29,6 +35,29 @@ class ClientDatumRequiredFieldsTest(unittest.TestCase):
 
         self.assertEqual(client.required_missing_fields(), [])
 
+    def test_construct_client_restores_serialized_payload(self) -> None:
+        client = ClientDatum(
+            client_id="aisha@example.com",
+            personal_info=PersonalInfo(name="Aisha Tan", date_of_birth=date(1991, 6, 15)),
+            trips=[
+                TripDetails(
+                    destination="Bali",
+                    start_date=date(2025, 12, 1),
+                    end_date=date(2025, 12, 10),
+                    trip_type="single",
+                )
+            ],
+        )
+
+        rebuilt = construct_client(serialize_client(client))
+
+        self.assertIsInstance(rebuilt.personal_info, PersonalInfo)
+        self.assertEqual(rebuilt.personal_info.date_of_birth, date(1991, 6, 15))
+        self.assertIsInstance(rebuilt.trips[0], TripDetails)
+        self.assertEqual(rebuilt.trips[0].start_date, date(2025, 12, 1))
+        self.assertEqual(rebuilt.trips[0].end_date, date(2025, 12, 10))
+        self.assertEqual(serialize_client(rebuilt), serialize_client(client))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import importlib
 import json
 import os
-from datetime import date
+from datetime import date, datetime
 
 import pytest
 from fastapi import HTTPException
@@ -16,6 +17,9 @@ from src.gmail_portal import router
 from src.config import Settings
 from src.state.client_context import ClientDatum, TripDetails
 
+# ``src.gmail_portal.router`` the attribute is the APIRouter; the module holds the helpers.
+portal_router = importlib.import_module("src.gmail_portal.router")
+
 
 @pytest.fixture(autouse=True)
 def reset_settings_cache():
@@ -91,3 +95,28 @@ def test_gmail_client_serialization_is_json_safe() -> None:
     assert payload["trips"][0]["endDate"] == "2024-05-10"
 
     json.dumps(payload)  # Should not raise TypeError
+
+
+def test_credentials_session_round_trip_keeps_refresh_fields() -> None:
+    credentials = portal_router.Credentials(
+        token="access-token",
+        refresh_token="refresh-token",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="client-id",
+        client_secret="client-secret",
+        scopes=portal_router.GOOGLE_SCOPES,
+        expiry=datetime(2030, 1, 1, 12, 0, 0),
+        rapt_token="rapt-token",
+        universe_domain="example-universe.com",
+        account="traveller@example.com",
+    )
+
+    stored = json.loads(json.dumps(portal_router._credentials_to_session(credentials)))
+    restored = portal_router.Credentials.from_authorized_user_info(stored, scopes=portal_router.GOOGLE_SCOPES)
+
+    assert restored.token == "access-token"
+    assert restored.refresh_token == "refresh-token"
+    assert restored.rapt_token == "rapt-token"
+    assert restored.universe_domain == "example-universe.com"
+    assert restored.account == "traveller@example.com"
+    assert restored.expiry == datetime(2030, 1, 1, 12, 0, 0)
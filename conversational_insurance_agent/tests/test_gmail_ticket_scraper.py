@@ -5,7 +5,16 @@ from datetime import date
 
 import pytest
 
-from src.services.gmail_ticket_scraper import _extract_dates, _extract_destination, _parse_trip_candidate
+from src.services.gmail_ticket_scraper import (
+    MAX_BODY_BYTES,
+    _batch_get_messages,
+    _decode_body,
+    _extract_dates,
+    _extract_destination,
+    _html_to_text,
+    _parse_date,
+    _parse_trip_candidate,
+)
 
 
 def _encode_body(content: str) -> str:
@@ -70,3 +79,124 @@ def test_extract_helpers_handle_mixed_formats():
     assert dest == "Paris"
     assert start == date(2025, 3, 2)
     assert end == date(2025, 3, 12)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        # Month names containing "st"/"nd"/"rd"/"th" used to lose those letters ("Augu 5, 2024").
+        ("August 5, 2024", date(2024, 8, 5)),
+        ("5th August 2024", date(2024, 8, 5)),
+        ("August 5th, 2024", date(2024, 8, 5)),
+        ("22nd March 2025", date(2025, 3, 22)),
+        ("1st Sep 2025", date(2025, 9, 1)),
+        ("Thursday", None),
+        # No year to anchor the date, so it is not guessed.
+        ("Aug 5th", None),
+    ],
+)
+def test_parse_date_strips_only_ordinal_suffixes(value, expected):
+    assert _parse_date(value) == expected
+
+
+def test_extract_dates_reads_month_names_with_ordinal_letters():
+    start, end = _extract_dates("Departs August 5, 2024 from Singapore. Return flight on August 15, 2024.")
+
+    assert start == date(2024, 8, 5)
+    assert end == date(2024, 8, 15)
+
+
+class _FakeMessagesApi:
+    def get(self, *, userId: str, id: str, format: str) -> dict:
+        return {"userId": userId, "id": id, "format": format}
+
+
+class _FakeBatch:
+    def __init__(self, callback, failures: dict) -> None:
+        self._callback = callback
+        self._failures = failures
+        self.requests: list = []
+
+    def add(self, request: dict, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        # Gmail answers batch parts in whatever order they complete.
+        for request_id, request in reversed(self.requests):
+            error = self._failures.get(request_id)
+            if error is not None:
+                self._callback(request_id, None, error)
+            else:
+                self._callback(request_id, {"id": request["id"], "format": request["format"]}, None)
+
+
+class _FakeGmailService:
+    def __init__(self, failures: dict | None = None) -> None:
+        self.failures = failures or {}
+        self.batches: list = []
+
+    def users(self):
+        return self
+
+    def messages(self) -> _FakeMessagesApi:
+        return _FakeMessagesApi()
+
+    def new_batch_http_request(self, callback) -> _FakeBatch:
+        batch = _FakeBatch(callback, self.failures)
+        self.batches.append(batch)
+        return batch
+
+
+def test_batch_get_messages_keeps_list_order_and_skips_failed_parts():
+    service = _FakeGmailService(failures={"m2": RuntimeError("rate limited")})
+
+    messages = _batch_get_messages(service, [{"id": "m1"}, {"id": "m2"}, {"id": "m3"}, {"id": "m1"}, {}])
+
+    assert [message["id"] for message in messages] == ["m1", "m3"]
+    assert all(message["format"] == "full" for message in messages)
+    (batch,) = service.batches
+    assert [request_id for request_id, _ in batch.requests] == ["m1", "m2", "m3"]
+
+
+def test_batch_get_messages_skips_the_batch_when_there_are_no_ids():
+    service = _FakeGmailService()
+
+    assert _batch_get_messages(service, [{}, {"id": ""}]) == []
+    assert service.batches == []
+
+
+def test_html_to_text_drops_non_text_tags_and_breaks_blocks():
+    html = (
+        "<html><head><style>p { color: red }</style><script>var fare = 1;</script></head>"
+        "<body><p>Flight to Tokyo</p><div>Fare SGD 1,200 &amp; taxes &gt; fees</div>"
+        "<ul><li>Depart 2025-12-10</li><li>Return 2025-12-20</li></ul>"
+        "<template>hidden</template></body></html>"
+    )
+
+    text = _html_to_text(html)
+
+    assert text.splitlines() == [
+        "Flight to Tokyo",
+        "Fare SGD 1,200 & taxes > fees",
+        "Depart 2025-12-10",
+        "Return 2025-12-20",
+    ]
+    assert "color" not in text and "var fare" not in text and "hidden" not in text
+
+
+def test_html_to_text_handles_empty_markup():
+    assert _html_to_text("") == ""
+
+
+def test_decode_body_truncates_to_max_body_bytes():
+    body = "Destination: Tokyo\n" + "é" * MAX_BODY_BYTES
+
+    decoded = _decode_body(_encode_body(body))
+
+    assert decoded.startswith("Destination: Tokyo\n")
+    assert len(decoded.encode("utf-8")) <= MAX_BODY_BYTES
+    assert len(decoded.encode("utf-8")) > MAX_BODY_BYTES - 4
+
+
+def test_decode_body_keeps_short_bodies_intact():
+    assert _decode_body(_encode_body("Fare: SGD 120")) == "Fare: SGD 120"
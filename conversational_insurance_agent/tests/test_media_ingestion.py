@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+from types import SimpleNamespace
+from typing import IO, List, Optional, Tuple
+
+import pytest
+
+from src.services import media_ingestion
+from src.services.media_ingestion import GroqMediaIngestor, MediaAttachment
+
+
+class _CountingIngestor(GroqMediaIngestor):
+    def __init__(self) -> None:
+        settings = SimpleNamespace(
+            groq_api_key="test-key",
+            groq_model="text-model",
+            groq_vision_model="vision-model",
+            twilio_account_sid="AC123",
+            twilio_auth_token="token",
+        )
+        super().__init__(settings)  # type: ignore[arg-type]
+        self.summaries: List[Tuple[str, Optional[str]]] = []
+
+    async def _download(self, url: str) -> Tuple[IO[bytes], bytes]:
+        # The URL doubles as the payload, so equal URLs stand in for identical uploads.
+        return io.BytesIO(url.encode()), url.encode()
+
+    async def _summarise_pdf(self, data: IO[bytes], filename: Optional[str]) -> str:
+        self.summaries.append((data.read().decode(), filename))
+        return f"Summary of {filename}"
+
+    async def _describe_image(self, image, content_type: str) -> str:
+        self.summaries.append((image.read().decode(), None))
+        return "An image"
+
+
+def _pdf(url: str, filename: str) -> MediaAttachment:
+    return MediaAttachment(url=url, content_type="application/pdf", filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_hits_for_identical_uploads() -> None:
+    ingestor = _CountingIngestor()
+
+    first = await ingestor.analyse([_pdf("https://media/1", "policy.pdf")])
+    second = await ingestor.analyse([_pdf("https://media/1", "policy.pdf")])
+
+    assert first == second == ["Summary of policy.pdf"]
+    assert len(ingestor.summaries) == 1
+    await ingestor.aclose()
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_keys_pdfs_by_filename() -> None:
+    ingestor = _CountingIngestor()
+
+    await ingestor.analyse([_pdf("https://media/1", "policy.pdf")])
+    renamed = await ingestor.analyse([_pdf("https://media/1", "itinerary.pdf")])
+
+    assert renamed == ["Summary of itinerary.pdf"]
+    assert len(ingestor.summaries) == 2
+    await ingestor.aclose()
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(media_ingestion, "MEDIA_SUMMARY_CACHE_SIZE", 2)
+    ingestor = _CountingIngestor()
+
+    for url in ("https://media/a", "https://media/b", "https://media/a", "https://media/c"):
+        await ingestor.analyse([_pdf(url, "doc.pdf")])
+    # "b" was least recently used when "c" arrived, so only it is summarised again.
+    await ingestor.analyse([_pdf("https://media/a", "doc.pdf")])
+    await ingestor.analyse([_pdf("https://media/b", "doc.pdf")])
+
+    assert [payload for payload, _ in ingestor.summaries] == [
+        "https://media/a",
+        "https://media/b",
+        "https://media/c",
+        "https://media/b",
+    ]
+    await ingestor.aclose()
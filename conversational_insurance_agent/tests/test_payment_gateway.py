@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from src.services import payment
+from src.services.payment import (
+    AUX_SERVICE_COOLDOWN_SECONDS,
+    AUX_SERVICE_FAILURE_THRESHOLD,
+    PaymentGateway,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeGateway:
+    """Wraps a PaymentGateway whose session service and Stripe calls are scripted."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.clock = _Clock()
+        # Swap the module's clock only; the event loop keeps the real time.monotonic.
+        monkeypatch.setattr(payment, "time", SimpleNamespace(monotonic=self.clock))
+        monkeypatch.setattr(
+            payment,
+            "get_settings",
+            lambda: SimpleNamespace(
+                stripe_api_key="",
+                payments_base_url="http://payments.test",
+                payment_status_url="http://payments.test/payments",
+            ),
+        )
+        self.gateway = PaymentGateway()
+        self.gateway._settings = SimpleNamespace(stripe_api_key="sk_test")
+        self.aux_healthy = False
+        self.aux_delay = 0.0
+        self.aux_calls = 0
+        self.stripe_keys: List[str] = []
+        self.gateway._post_session_service = self._aux  # type: ignore[method-assign]
+        self.gateway._checkout_session_call = self._stripe  # type: ignore[method-assign]
+
+    async def _aux(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.aux_calls += 1
+        if self.aux_delay:
+            await asyncio.sleep(self.aux_delay)
+        if not self.aux_healthy:
+            raise RuntimeError("session service unavailable")
+        return {"session_id": "aux-session", "checkout_url": "https://pay.test/aux"}
+
+    async def _stripe(self, method_name: str, **kwargs: Any) -> Any:
+        self.stripe_keys.append(kwargs["idempotency_key"])
+        return SimpleNamespace(id="cs_test", url="https://checkout.stripe.test")
+
+    async def checkout(self) -> str:
+        result = await self.gateway.create_checkout_session(
+            plan_code="gold",
+            amount=1000,
+            currency="sgd",
+            success_url="https://ok.test",
+            cancel_url="https://cancel.test",
+        )
+        return result["session_id"]
+
+    async def trip_circuit(self) -> None:
+        for _ in range(AUX_SERVICE_FAILURE_THRESHOLD):
+            assert await self.checkout() == "cs_test"
+        assert self.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_threshold_and_skips_during_cooldown(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeGateway(monkeypatch)
+    await fake.trip_circuit()
+
+    fake.clock.now += AUX_SERVICE_COOLDOWN_SECONDS - 1
+    assert await fake.checkout() == "cs_test"
+
+    assert fake.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD
+    await fake.gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_successful_probe_closes_the_circuit(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeGateway(monkeypatch)
+    await fake.trip_circuit()
+
+    fake.aux_healthy = True
+    fake.clock.now += AUX_SERVICE_COOLDOWN_SECONDS
+    assert await fake.checkout() == "aux-session"
+    assert await fake.checkout() == "aux-session"
+
+    assert fake.gateway._aux_failures == 0
+    assert fake.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD + 2
+    await fake.gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_circuit(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeGateway(monkeypatch)
+    await fake.trip_circuit()
+
+    fake.clock.now += AUX_SERVICE_COOLDOWN_SECONDS
+    assert await fake.checkout() == "cs_test"
+    assert fake.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD + 1
+
+    fake.clock.now += AUX_SERVICE_COOLDOWN_SECONDS - 1
+    assert await fake.checkout() == "cs_test"
+    assert fake.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD + 1
+    await fake.gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_only_one_half_open_probe_runs_at_a_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeGateway(monkeypatch)
+    await fake.trip_circuit()
+
+    fake.aux_healthy = True
+    fake.aux_delay = 0.01
+    fake.clock.now += AUX_SERVICE_COOLDOWN_SECONDS
+    sessions = await asyncio.gather(*(fake.checkout() for _ in range(5)))
+
+    assert sorted(sessions) == ["aux-session"] + ["cs_test"] * 4
+    assert fake.aux_calls == AUX_SERVICE_FAILURE_THRESHOLD + 1
+    assert fake.gateway._aux_probe_in_flight is False
+    await fake.gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_each_stripe_checkout_gets_its_own_idempotency_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeGateway(monkeypatch)
+
+    await fake.checkout()
+    await fake.checkout()
+
+    assert len(set(fake.stripe_keys)) == 2
+    await fake.gateway.aclose()
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from groq import APIStatusError
+
+from src.services.policy_taxonomy import (
+    SYS_L1,
+    SYS_L2,
+    SYS_L3,
+    IngestCfg,
+    PolicyIngestor,
+    _JsonEndScanner,
+    _strip_boilerplate,
+    extract_all_layers,
+)
+
+PRODUCT = "Scootsurance"
+
+PRODUCT_ENTRY = {"condition_exist": True, "original_text": "Example.", "parameters": {}}
+
+LAYER_REPLIES: Dict[str, Any] = {
+    SYS_L1: [
+        {
+            "condition": "age_limit",
+            "condition_type": "eligibility",
+            "products": {PRODUCT: PRODUCT_ENTRY},
+        }
+    ],
+    SYS_L2: [
+        {
+            "benefit_name": "medical_expenses",
+            "parameters": [],
+            "products": {
+                PRODUCT: {
+                    "condition_exist": True,
+                    "parameters": {"coverage_limit": "$1,000", "sub_limits": {}},
+                }
+            },
+        }
+    ],
+    SYS_L3: [
+        {
+            "benefit_name": "medical_expenses",
+            "condition": "hospitalised",
+            "condition_type": "benefit_eligibility",
+            "parameters": [],
+            "products": {PRODUCT: PRODUCT_ENTRY},
+        }
+    ],
+}
+
+
+class _FakeStream:
+    def __init__(self, content: str) -> None:
+        self._content = content
+
+    def __enter__(self) -> "_FakeStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def __iter__(self):
+        for piece in (self._content[:10], self._content[10:]):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class _FakeCompletions:
+    def __init__(self, fused_reply: Any) -> None:
+        self.fused_reply = fused_reply
+        self.calls: List[str] = []
+
+    def create(self, *, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        system = messages[0]["content"]
+        if kwargs.get("response_format"):
+            self.calls.append("fused")
+            if isinstance(self.fused_reply, Exception):
+                raise self.fused_reply
+            message = SimpleNamespace(content=self.fused_reply)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="length")])
+        self.calls.append(system)
+        return _FakeStream(json.dumps(LAYER_REPLIES[system]))
+
+
+def _ingestor(fused_reply: Any, retries: int = 1) -> PolicyIngestor:
+    completions = _FakeCompletions(fused_reply)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    cfg = IngestCfg(groq_api_key="test-key", retries=retries, cache_enabled=False)
+    ingestor = PolicyIngestor(cfg, client=client)  # type: ignore[arg-type]
+    ingestor._prepare = lambda pdf_path: "Policy wording."  # type: ignore[method-assign]
+    return ingestor
+
+
+def test_extract_all_layers_falls_back_when_fused_reply_is_truncated() -> None:
+    ingestor = _ingestor('{"layer_1": [{"condition": "age_')
+
+    result = extract_all_layers("policy.pdf", PRODUCT, ingestor)
+
+    calls = ingestor.client.chat.completions.calls
+    assert calls[0] == "fused"
+    assert sorted(calls[1:]) == sorted([SYS_L1, SYS_L2, SYS_L3])
+    assert result == {
+        "layer_1_general_conditions": LAYER_REPLIES[SYS_L1],
+        "layer_2_benefits": LAYER_REPLIES[SYS_L2],
+        "layer_3_benefit_conditions": LAYER_REPLIES[SYS_L3],
+    }
+
+
+def test_json_mode_rejection_falls_back_without_retrying() -> None:
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    rejection = APIStatusError(
+        "json_validate_failed",
+        response=httpx.Response(400, request=request),
+        body={"error": {"code": "json_validate_failed"}},
+    )
+    ingestor = _ingestor(rejection, retries=3)
+
+    result = extract_all_layers("policy.pdf", PRODUCT, ingestor)
+
+    calls = ingestor.client.chat.completions.calls
+    assert calls.count("fused") == 1
+    assert len(calls) == 4
+    assert result["layer_2_benefits"] == LAYER_REPLIES[SYS_L2]
+
+
+def test_truncated_json_mode_reply_is_not_retried() -> None:
+    ingestor = _ingestor('{"layer_1": [', retries=3)
+
+    extract_all_layers("policy.pdf", PRODUCT, ingestor)
+
+    assert ingestor.client.chat.completions.calls.count("fused") == 1
+
+
+def test_fused_max_tokens_covers_the_per_layer_budgets() -> None:
+    cfg = IngestCfg(groq_api_key="test-key")
+
+    assert cfg.fused_max_tokens >= 3 * cfg.max_tokens
+
+
+def test_extract_all_layers_rejects_blank_label() -> None:
+    with pytest.raises(ValueError):
+        extract_all_layers("policy.pdf", "  ", _ingestor("{}"))
+
+
+def _stop_index(text: str) -> int | None:
+    """Feed ``text`` one character at a time and return where the scanner stops."""
+
+    scanner = _JsonEndScanner()
+    for index, char in enumerate(text):
+        if scanner.feed(char):
+            return index
+    return None
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        '{"a": [1, {"b": [2, [3]]}], "c": {}}',
+        '[{"a": "}]{[ brackets in a string"}, ["]"]]',
+        '{"quote": "she said \\"}]\\" twice"}',
+        '{"path": "C:\\\\", "next": [1]}',
+    ],
+)
+def test_json_end_scanner_stops_at_the_closing_bracket(reply: str) -> None:
+    assert json.loads(reply) is not None
+    assert _stop_index(reply + " trailing prose") == len(reply) - 1
+
+
+def test_json_end_scanner_accepts_fenced_json() -> None:
+    body = '[{"a": "x"}]'
+    reply = "```json\n" + body + "\n```"
+
+    assert _stop_index(reply) == len("```json\n") + len(body) - 1
+
+
+def test_json_end_scanner_never_stops_after_leading_prose() -> None:
+    assert _stop_index('Here is the JSON: {"a": 1} and {"b": 2}') is None
+
+
+def test_json_end_scanner_waits_for_an_unfinished_value() -> None:
+    scanner = _JsonEndScanner()
+
+    assert not scanner.feed('{"a": [1, 2')
+    assert not scanner.feed(', "}"]')
+    assert scanner.feed("}")
+
+
+def _policy_page(number: int, *body: str) -> tuple[int, str]:
+    lines = ["TravelEasy Policy Wording", "QTD032212", *body, "MSIG Insurance (Singapore) Pte. Ltd.", str(number)]
+    return number, "\n".join(lines)
+
+
+def test_strip_boilerplate_removes_running_headers_and_footers() -> None:
+    pages = [
+        _policy_page(number, f"Clause {number}.1 applies.", f"Clause {number}.2", f"Clause {number}.3")
+        for number in range(1, 5)
+    ]
+
+    cleaned = _strip_boilerplate(pages)
+
+    assert cleaned[0] == (1, "Clause 1.1 applies.\nClause 1.2\nClause 1.3")
+    assert all("QTD032212" not in text and "MSIG" not in text for _, text in cleaned)
+
+
+def test_strip_boilerplate_leaves_short_documents_alone() -> None:
+    pages = [_policy_page(1, "Only page body.", "a", "b"), _policy_page(2, "Second body.", "c", "d")]
+
+    cleaned = _strip_boilerplate(pages)
+
+    # Too few pages to call anything a running header; only the bare page numbers go.
+    assert cleaned == [(number, text.rsplit("\n", 1)[0]) for number, text in pages]
+
+
+def test_strip_boilerplate_keeps_pages_shorter_than_the_edge_window() -> None:
+    pages = [(number, "Section 6 Medical Expenses\nUp to $250,000\n2") for number in range(1, 6)]
+
+    assert _strip_boilerplate(pages) == pages
+
+
+def test_strip_boilerplate_keeps_repeated_headings_inside_the_body() -> None:
+    pages = [
+        _policy_page(
+            number,
+            *(["Introductory wording."] * (number % 3)),
+            "Section 6 Medical Expenses",
+            "Benefit | Limit",
+            f"Row {number} | $1,000",
+            "TravelEasy Policy Wording",
+            "Closing wording.",
+            "Closing wording.",
+            "Closing wording.",
+        )
+        for number in range(1, 6)
+    ]
+
+    cleaned = _strip_boilerplate(pages)
+
+    for _, text in cleaned:
+        assert "Section 6 Medical Expenses\nBenefit | Limit" in text
+        # The running header text is kept where it appears mid-page as policy wording.
+        assert text.count("TravelEasy Policy Wording") == 1
+
+
+def test_strip_boilerplate_keeps_edge_lines_below_the_repeat_ratio() -> None:
+    pages = [
+        _policy_page(number, "Benefit | Limit" if number <= 2 else f"Clause {number}", "a", "b", "c")
+        for number in range(1, 6)
+    ]
+
+    cleaned = _strip_boilerplate(pages)
+
+    assert cleaned[0][1].startswith("Benefit | Limit")
+    assert cleaned[1][1].startswith("Benefit | Limit")
+
+
+def _parsing_ingestor(load_pages: Any) -> PolicyIngestor:
+    cfg = IngestCfg(groq_api_key="test-key", cache_enabled=False)
+    ingestor = PolicyIngestor(cfg, client=SimpleNamespace())  # type: ignore[arg-type]
+    ingestor._load_pages = load_pages  # type: ignore[method-assign]
+    return ingestor
+
+
+def test_prepare_parses_different_pdfs_concurrently(tmp_path: Path) -> None:
+    paths = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    for path in paths:
+        path.write_bytes(b"%PDF")
+    # Each parse waits for the other, so this only finishes if they run side by side.
+    barrier = threading.Barrier(len(paths), timeout=5)
+
+    def load_pages(pdf_path: str) -> List[tuple[int, str]]:
+        barrier.wait()
+        return [(1, f"Wording of {Path(pdf_path).name}.")]
+
+    ingestor = _parsing_ingestor(load_pages)
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        texts = list(pool.map(ingestor._prepare, map(str, paths)))
+
+    assert texts == ["[PAGES 1-1]\nWording of a.pdf.", "[PAGES 1-1]\nWording of b.pdf."]
+
+
+def test_prepare_parses_a_pdf_once_for_concurrent_callers(tmp_path: Path) -> None:
+    path = tmp_path / "policy.pdf"
+    path.write_bytes(b"%PDF")
+    release = threading.Event()
+    loads: List[str] = []
+
+    def load_pages(pdf_path: str) -> List[tuple[int, str]]:
+        loads.append(pdf_path)
+        release.wait(timeout=5)
+        return [(1, "Policy wording.")]
+
+    ingestor = _parsing_ingestor(load_pages)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(ingestor._prepare, str(path)) for _ in range(4)]
+        release.set()
+        texts = [future.result() for future in futures]
+
+    assert loads == [str(path)]
+    assert set(texts) == {"[PAGES 1-1]\nPolicy wording."}
+
+
+def test_prepare_does_not_cache_a_failed_parse(tmp_path: Path) -> None:
+    path = tmp_path / "policy.pdf"
+    path.write_bytes(b"%PDF")
+    replies: List[Any] = [ValueError("PDF is encrypted"), [(1, "Policy wording.")]]
+
+    def load_pages(pdf_path: str) -> List[tuple[int, str]]:
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    ingestor = _parsing_ingestor(load_pages)
+    with pytest.raises(ValueError):
+        ingestor._prepare(str(path))
+
+    assert ingestor._prepare(str(path)) == "[PAGES 1-1]\nPolicy wording."
+
+
+def test_strip_boilerplate_strips_page_numbers_offset_from_the_physical_page() -> None:
+    # Printed numbering starts at 3 after two unnumbered cover pages.
+    pages = [(number, _policy_page(number + 2, f"Clause {number}.1", "a", "b")[1]) for number in range(1, 5)]
+
+    cleaned = _strip_boilerplate(pages)
+
+    assert all(not text.rstrip().splitlines()[-1].isdigit() for _, text in cleaned)
+
+
+def test_strip_boilerplate_keeps_numbers_that_do_not_follow_the_page_sequence() -> None:
+    pages = [
+        (number, f"Clause {number}\nTable of limits\nbody\nmore\nmore\nMaximum payout\n{amount}")
+        for number, amount in enumerate(["250", "1000", "75", "250"], start=1)
+    ]
+
+    cleaned = _strip_boilerplate(pages)
+
+    assert [text.splitlines()[-1] for _, text in cleaned] == ["250", "1000", "75", "250"]
+
+
+def test_chunk_renders_one_page_range_marker_per_chunk() -> None:
+    ingestor = _ingestor("{}")
+    ingestor.cfg.max_chars = 40
+    pages = [(1, "First page wording."), (2, "Second page."), (3, ""), (4, "Fourth page wording.")]
+
+    chunks = ingestor._chunk(pages)
+
+    assert [chunk["rendered"] for chunk in chunks] == [
+        "[PAGES 1-2]\nFirst page wording.\n\nSecond page.",
+        "[PAGES 4-4]\nFourth page wording.",
+    ]
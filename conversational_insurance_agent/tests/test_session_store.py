@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, Optional
+
+from src.state.client_context import ClientDatum, PersonalInfo
+from src.state.session_store import ConversationSessionStore
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: Dict[str, str] = {}
+        self.writes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
+        self.writes += 1
+        self.data[key] = value
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+def _store() -> ConversationSessionStore:
+    store = ConversationSessionStore.__new__(ConversationSessionStore)
+    store._redis = _FakeRedis()
+    store._prefix = "conversation"
+    store._ttl_seconds = 60
+    return store
+
+
+def _client(name: str) -> ClientDatum:
+    return ClientDatum(personal_info=PersonalInfo(name=name), trips=[])
+
+
+def test_merge_clients_if_changed_skips_an_unchanged_payload() -> None:
+    store = _store()
+
+    assert store.merge_clients_if_changed("s1", [_client("Aisha")], "gmail_portal", "fp-1")
+    writes = store._redis.writes
+
+    assert not store.merge_clients_if_changed("s1", [_client("Aisha")], "gmail_portal", "fp-1")
+    assert store._redis.writes == writes
+
+
+def test_merge_clients_if_changed_merges_a_new_fingerprint() -> None:
+    store = _store()
+    store.merge_clients_if_changed("s1", [_client("Aisha")], "gmail_portal", "fp-1")
+
+    assert store.merge_clients_if_changed("s1", [_client("Aisha Tan")], "gmail_portal", "fp-2")
+
+    session = store.get("s1")
+    assert session["client_fingerprints"] == {"gmail_portal": "fp-2"}
+    assert store.get_clients("s1")
+
+
+def test_client_fingerprint_lives_on_the_session_record() -> None:
+    store = _store()
+    store.merge_clients("s1", [_client("Aisha")], "gmail_portal", fingerprint="fp-1")
+
+    record = json.loads(store._redis.data["conversation:s1"])
+    assert record["client_fingerprints"] == {"gmail_portal": "fp-1"}
+
+    # Once the conversation record expires, the fingerprint goes with it and the merge reruns.
+    store._redis.delete("conversation:s1")
+    assert store.merge_clients_if_changed("s1", [_client("Aisha")], "gmail_portal", "fp-1")
+    assert len(store.get_clients("s1")) == 1
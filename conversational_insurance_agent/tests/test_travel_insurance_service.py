@@ -1,5 +1,7 @@
+from types import SimpleNamespace
 from typing import Any, Dict
 
+import orjson
 import pytest
 
 from src.services.travel_insurance import AncileoAPIError, AncileoTravelAPI
@@ -28,6 +30,7 @@ class _DummySettings:
     ancileo_default_language = "en"
     ancileo_default_channel = "white-label"
     ancileo_default_device = "DESKTOP"
+    ancileo_quote_cache_ttl = 60.0
 
 
 class _CapturingResponse:
@@ -35,6 +38,7 @@ class _CapturingResponse:
         self._payload = payload
         self.status_code = 200
         self.text = "{}"
+        self.content = orjson.dumps(payload)
 
     def raise_for_status(self) -> None:
         return None
@@ -47,17 +51,16 @@ class _CapturingClient:
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.kwargs = kwargs
         self.captured: Dict[str, Any] = {}
+        self.calls = 0
 
-    async def __aenter__(self) -> "_CapturingClient":
-        return self
-
-    async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+    async def aclose(self) -> None:
         return None
 
-    async def post(self, url: str, json: Dict[str, Any], headers: Dict[str, Any]):
+    async def post(self, url: str, content: bytes, headers: Dict[str, Any]):
+        self.calls += 1
         self.captured = {
             "url": url,
-            "json": json,
+            "json": orjson.loads(content),
             "headers": headers,
         }
         return _CapturingResponse({"quoteId": "quote-123", "offers": []})
@@ -144,6 +147,71 @@ async def test_quote_payload_matches_expected_snapshot(monkeypatch: pytest.Monke
     assert captured_request == EXPECTED_HARDCODED_QUOTE_PAYLOAD
 
 
+@pytest.mark.asyncio
+async def test_quote_reuses_cached_response(monkeypatch: pytest.MonkeyPatch) -> None:
+    client_holder: Dict[str, Any] = {}
+
+    def _client_factory(*args: Any, **kwargs: Any) -> _CapturingClient:
+        client = _CapturingClient(*args, **kwargs)
+        client_holder["client"] = client
+        return client
+
+    monkeypatch.setattr("src.services.travel_insurance.httpx.AsyncClient", _client_factory)
+
+    api = AncileoTravelAPI(settings=_DummySettings())
+
+    first = await api.quote()
+    second = await api.quote()
+
+    assert second == first
+    assert client_holder["client"].calls == 1  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_cached_quote_is_copied_per_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.services.travel_insurance.httpx.AsyncClient", _CapturingClient)
+
+    api = AncileoTravelAPI(settings=_DummySettings())
+
+    first = await api.quote()
+    first["offers"].append({"offerId": "tampered"})
+    first["quoteId"] = "tampered"
+    second = await api.quote()
+    third = await api.quote()
+
+    assert second == {"quoteId": "quote-123", "offers": []}
+    second["offers"].append({"offerId": "tampered"})
+    assert third == {"quoteId": "quote-123", "offers": []}
+
+
+@pytest.mark.asyncio
+async def test_cached_quote_expires_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    client_holder: Dict[str, Any] = {}
+
+    def _client_factory(*args: Any, **kwargs: Any) -> _CapturingClient:
+        client = _CapturingClient(*args, **kwargs)
+        client_holder["client"] = client
+        return client
+
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr("src.services.travel_insurance.httpx.AsyncClient", _client_factory)
+    # Replace only the module's clock; the event loop keeps the real time.monotonic.
+    monkeypatch.setattr(
+        "src.services.travel_insurance.time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+
+    api = AncileoTravelAPI(settings=_DummySettings())
+
+    await api.quote()
+    clock.now += _DummySettings.ancileo_quote_cache_ttl - 1
+    await api.quote()
+    assert client_holder["client"].calls == 1  # type: ignore[index]
+
+    clock.now += 1
+    await api.quote()
+    assert client_holder["client"].calls == 2  # type: ignore[index]
+
+
 @pytest.mark.asyncio
 async def test_purchase_requires_api_key() -> None:
     class _NoKeySettings(_DummySettings):